@@ -0,0 +1,27 @@
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def make_file():
+    """Build a stand-in for dify_plugin's File carrying the given upload bytes."""
+    def _make_file(filename, blob, mime_type="application/octet-stream"):
+        return SimpleNamespace(
+            filename=filename,
+            extension=os.path.splitext(filename)[1],
+            mime_type=mime_type,
+            size=len(blob),
+            url="",
+            blob=blob,
+        )
+    return _make_file
+
+
+def blob_messages(messages):
+    """The blob payloads among a tool's yielded messages, in order."""
+    return [m.message.blob for m in messages if m.type == m.MessageType.BLOB]
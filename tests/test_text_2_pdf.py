@@ -0,0 +1,20 @@
+import fitz
+
+from conftest import blob_messages
+from tools.text_2_pdf import TextToPdfTool
+
+
+def _page_lines(make_file, text_bytes):
+    tool = TextToPdfTool.from_credentials({})
+    messages = list(tool._invoke({"input_file": make_file("notes.txt", text_bytes, "text/plain")}))
+    blobs = blob_messages(messages)
+    assert len(blobs) == 1
+    with fitz.open(stream=blobs[0], filetype="pdf") as pdf:
+        return [line for page in pdf for line in page.get_text().splitlines() if line.strip()]
+
+
+def test_crlf_upload_splits_paragraphs_like_lf(make_file):
+    lf = "First paragraph\n\nSecond paragraph\n\nThird paragraph"
+    lf_lines = _page_lines(make_file, lf.encode("utf-8"))
+    assert lf_lines == ["First paragraph", "Second paragraph", "Third paragraph"]
+    assert _page_lines(make_file, lf.replace("\n", "\r\n").encode("utf-8")) == lf_lines
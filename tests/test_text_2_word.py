@@ -0,0 +1,21 @@
+import io
+
+from docx import Document
+
+from conftest import blob_messages
+from tools.text_2_word import TextToWordTool
+
+
+def _convert(make_file, text_bytes):
+    tool = TextToWordTool.from_credentials({})
+    messages = list(tool._invoke({"input_file": make_file("notes.txt", text_bytes, "text/plain")}))
+    blobs = blob_messages(messages)
+    assert len(blobs) == 1
+    return [p.text for p in Document(io.BytesIO(blobs[0])).paragraphs]
+
+
+def test_crlf_upload_splits_paragraphs_like_lf(make_file):
+    lf = "First\n\nSecond line one\nSecond line two\n\nThird"
+    expected = ["First", "Second line one\nSecond line two", "Third"]
+    assert _convert(make_file, lf.encode("utf-8")) == expected
+    assert _convert(make_file, lf.replace("\n", "\r\n").encode("utf-8")) == expected
@@ -0,0 +1,102 @@
+import io
+
+import fitz
+from docx import Document
+
+from tools.word_2_pdf import WordToPdfTool
+
+
+def _docx_bytes(doc):
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+
+def _pdf_text(docx_bytes):
+    """Render through the ReportLab path and return the PDF text with whitespace collapsed."""
+    pdf_bytes, msg = WordToPdfTool.from_credentials({})._convert_to_pdf(docx_bytes)
+    assert pdf_bytes, msg
+    with fitz.open(stream=pdf_bytes, filetype="pdf") as pdf:
+        return " ".join("".join(page.get_text() for page in pdf).split())
+
+
+def test_paragraph_tabs_and_breaks_separate_words():
+    doc = Document()
+    run = doc.add_paragraph().add_run("Name:")
+    run.add_tab()
+    run.add_text("Value")
+    run.add_break()
+    run.add_text("Second line")
+    assert _pdf_text(_docx_bytes(doc)) == "Name: Value Second line"
+
+
+_TEXT_BOX_RUN = """
+<w:r xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+     xmlns:mc="http://schemas.openxmlformats.org/markup-compatibility/2006"
+     xmlns:wp="http://schemas.openxmlformats.org/drawingml/2006/wordprocessingDrawing"
+     xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main"
+     xmlns:wps="http://schemas.microsoft.com/office/word/2010/wordprocessingShape"
+     xmlns:v="urn:schemas-microsoft-com:vml">
+  <mc:AlternateContent>
+    <mc:Choice Requires="wps">
+      <w:drawing>
+        <wp:anchor><wp:extent cx="914400" cy="457200"/>
+          <a:graphic><a:graphicData uri="http://schemas.microsoft.com/office/word/2010/wordprocessingShape">
+            <wps:wsp><wps:txbx><w:txbxContent>
+              <w:p><w:r><w:t>BOXTEXT</w:t></w:r></w:p>
+            </w:txbxContent></wps:txbx></wps:wsp>
+          </a:graphicData></a:graphic>
+        </wp:anchor>
+      </w:drawing>
+    </mc:Choice>
+    <mc:Fallback>
+      <w:pict><v:shape><v:textbox><w:txbxContent>
+        <w:p><w:r><w:t>BOXTEXT</w:t></w:r></w:p>
+      </w:txbxContent></v:textbox></v:shape></w:pict>
+    </mc:Fallback>
+  </mc:AlternateContent>
+</w:r>
+"""
+
+
+def test_text_box_content_is_not_spliced_into_body_paragraph():
+    from docx.oxml import parse_xml
+
+    doc = Document()
+    paragraph = doc.add_paragraph("Body with box")
+    paragraph._p.append(parse_xml(_TEXT_BOX_RUN))
+    assert _pdf_text(_docx_bytes(doc)) == "Body with box"
+
+
+def test_table_cell_tabs_and_breaks_separate_words():
+    doc = Document()
+    cells = doc.add_table(rows=1, cols=2).rows[0].cells
+    run = cells[0].paragraphs[0].add_run("a")
+    run.add_tab()
+    run.add_text("b")
+    run = cells[1].paragraphs[0].add_run("first")
+    run.add_break()
+    run.add_text("second")
+    assert _pdf_text(_docx_bytes(doc)) == "a b first second"
+
+
+def _invoke_texts(tool_parameters):
+    messages = list(WordToPdfTool.from_credentials({})._invoke(tool_parameters))
+    assert all(m.type == m.MessageType.TEXT for m in messages)
+    return [m.message.text for m in messages]
+
+
+def test_invoke_without_any_input_reports_missing_parameter():
+    assert _invoke_texts({}) == ["Error: Missing required parameter: provide 'input_file' or 'input_files'."]
+    assert _invoke_texts({"input_file": None, "input_files": []}) == [
+        "Error: Missing required parameter: provide 'input_file' or 'input_files'."
+    ]
+
+
+def test_invoke_with_both_inputs_is_rejected(make_file):
+    docx = _docx_bytes(Document())
+    texts = _invoke_texts({
+        "input_file": make_file("one.docx", docx),
+        "input_files": [make_file("two.docx", docx)],
+    })
+    assert texts == ["Error: Provide either 'input_file' or 'input_files', not both."]
@@ -1,3 +1,4 @@
+import logging
 import os
 import tempfile
 import zipfile
@@ -16,6 +17,8 @@ try:
 except ImportError:
     DEPENDENCIES_AVAILABLE = False
 
+logger = logging.getLogger(__name__)
+
 class ExcelToCsvTool(Tool):
     """
     Excel to CSV Converter Tool.
@@ -153,9 +156,9 @@ class ExcelCsvConverter:
                         "cols": cols
                     })
                     
-                except Exception as e:
+                except Exception:
                     # 如果某个工作表转换失败，记录错误但继续处理其他工作表
-                    print(f"Warning: Failed to convert sheet '{sheet_name}': {str(e)}")
+                    logger.warning("Failed to convert sheet '%s'", sheet_name, exc_info=True)
                     continue
             
             if not converted_files:
@@ -1,8 +1,11 @@
+import io
+import logging
 import os
 import tempfile
 import time
-from typing import Any, Dict, List, Generator, Tuple, Optional
+from typing import Any, BinaryIO, Dict, List, Generator, Tuple, Optional, Union
 import copy
+from functools import lru_cache
 
 from dify_plugin import Tool
 from dify_plugin.entities.tool import ToolInvokeMessage
@@ -22,10 +25,83 @@ try:
     from reportlab.pdfbase.ttfonts import TTFont
     from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak
     from reportlab.lib.enums import TA_CENTER, TA_LEFT
+    # reportlab 的基础样式表只需构建一次
+    _SAMPLE_STYLES = getSampleStyleSheet()
+    _SUBTITLE_STYLE = ParagraphStyle('sub', fontSize=8, textColor=colors.grey)
     DEPENDENCIES_AVAILABLE = True
 except ImportError:
     DEPENDENCIES_AVAILABLE = False
 
+# 单元格为纯文本，转义 ReportLab 段落解析器视为标记的字符
+_MARKUP_ESCAPE = str.maketrans({'&': '&amp;', '<': '&lt;', '>': '&gt;'})
+
+# 项目字体文件候选路径（../fonts/ 优先，其次 tools/fonts/），导入时计算一次
+_TOOLS_DIR = os.path.dirname(os.path.abspath(__file__))
+_PROJECT_FONT_PATHS = (
+    os.path.join(os.path.dirname(_TOOLS_DIR), "fonts", "chinese_font.ttc"),
+    os.path.join(_TOOLS_DIR, "fonts", "chinese_font.ttc"),
+)
+
+logger = logging.getLogger(__name__)
+
+@lru_cache(maxsize=None)
+def _get_base_styles(font_name, bold_font_name):
+    """按字体组合缓存正文/标题样式，避免每次转换重新构建 ParagraphStyle"""
+    # 定义中文样式
+    normal_style = ParagraphStyle(
+        name='Normal_CN',
+        parent=_SAMPLE_STYLES['Normal'],
+        fontName=font_name,
+        fontSize=10,
+        leading=12, # 行间距
+        alignment=TA_CENTER,
+        wordWrap='CJK' # 支持中文换行
+    )
+    
+    title_style = ParagraphStyle(
+        name='Title_CN',
+        parent=_SAMPLE_STYLES['Heading1'],
+        fontName=bold_font_name,
+        fontSize=16,
+        leading=20,
+        alignment=TA_CENTER,
+        spaceAfter=20
+    )
+    return normal_style, title_style
+
+@lru_cache(maxsize=64)
+def _get_cell_styles(base_style, font_size, bold_font_name):
+    """按字号缓存单元格/表头样式，切分出的各个表格及各工作表共用"""
+    cell_style = ParagraphStyle(
+        'CellStyle',
+        parent=base_style,
+        fontSize=font_size,
+        leading=font_size * 1.2
+    )
+
+    header_style = ParagraphStyle(
+        'HeaderStyle',
+        parent=cell_style,
+        fontName=bold_font_name,
+        textColor=colors.whitesmoke
+    )
+    return cell_style, header_style
+
+@lru_cache(maxsize=64)
+def _get_table_style(font_name, font_size):
+    """按 (字体, 字号) 缓存 TableStyle；setStyle 只读取其中的命令，各表格可共用"""
+    return TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.Color(0.2, 0.4, 0.6)), # 深蓝表头
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('VALIGN', (0, 0), (-1, -1), 'TOP'), # 顶部对齐以适应换行
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+        ('FONTNAME', (0, 0), (-1, -1), font_name),
+        ('FONTSIZE', (0, 0), (-1, -1), font_size),
+        ('topPadding', (0, 0), (-1, -1), 4),
+        ('bottomPadding', (0, 0), (-1, -1), 4),
+    ])
+
 class ExcelToPdfTool(Tool):
     """
     Excel to PDF Converter with Smart Layout Engine.
@@ -55,10 +131,11 @@ class ExcelToPdfTool(Tool):
                     f.write(input_file.blob)
                 
                 output_filename = os.path.splitext(input_file.filename)[0] + ".pdf"
-                output_path = os.path.join(temp_dir, output_filename)
+                # PDF 直接写入内存，无需落盘后再读回
+                pdf_buffer = io.BytesIO()
 
                 # 3. 执行转换核心逻辑
-                converter = ExcelPdfConverter(input_path, output_path)
+                converter = ExcelPdfConverter(input_path, pdf_buffer)
                 result = converter.convert()
 
                 if not result["success"]:
@@ -66,8 +143,7 @@ class ExcelToPdfTool(Tool):
                     return
 
                 # 4. 读取并返回结果
-                with open(output_path, 'rb') as f:
-                    pdf_content = f.read()
+                pdf_content = pdf_buffer.getvalue()
 
                 yield self.create_text_message("Conversion successful with smart layout optimization.")
                 
@@ -86,9 +162,13 @@ class ExcelPdfConverter:
     """
     内部转换器类，负责具体的排版算法和PDF生成
     """
-    def __init__(self, input_path: str, output_path: str):
+    # 字体注册结果按进程缓存：(常规字体, 粗体字体, 是否注册了中文字体)
+    _resolved_fonts: Optional[Tuple[str, str, bool]] = None
+
+    def __init__(self, input_path: str, output: Union[str, BinaryIO]):
         self.input_path = input_path
-        self.output_path = output_path
+        # 输出目标：文件路径或二进制文件对象（如 BytesIO）
+        self.output = output
         self.font_name = "CustomChineseFont"
         self.font_bold_name = "CustomChineseFont" # 只有单独字体文件时，粗体也用同一个
         self.registered_font = False
@@ -103,31 +183,28 @@ class ExcelPdfConverter:
         self._register_fonts()
 
     def _register_fonts(self):
-        """注册自定义字体，路径为 ../fonts/chinese_font.ttc"""
+        """注册自定义字体，路径为 ../fonts/chinese_font.ttc；首次解析 TTC 后复用结果"""
+        cached = type(self)._resolved_fonts
+        if cached is not None:
+            self.font_name, self.font_bold_name, self.registered_font = cached
+            return
         try:
-            # 获取当前脚本所在目录
-            current_dir = os.path.dirname(os.path.abspath(__file__))
-            # 向上寻找 fonts 目录 (假设结构 plugin/tools/tool.py -> plugin/fonts/)
-            # 根据插件结构可能 path 需要调整，这里假设 fonts 与 tools 同级目录或者在根目录下
-            # 尝试路径 1: ../fonts/
-            font_path = os.path.join(os.path.dirname(current_dir), "fonts", "chinese_font.ttc")
-            
-            if not os.path.exists(font_path):
-                # 备用路径: 当前目录下 fonts/
-                font_path = os.path.join(current_dir, "fonts", "chinese_font.ttc")
+            # 依次尝试 ../fonts/ 和当前目录下 fonts/
+            font_path = next((path for path in _PROJECT_FONT_PATHS if os.path.exists(path)), None)
 
-            if os.path.exists(font_path):
+            if font_path:
                 pdfmetrics.registerFont(TTFont(self.font_name, font_path))
                 self.registered_font = True
             else:
                 # 回退：如果找不到字体，使用内置字体（中文会乱码，但至少不报错）
-                print(f"Warning: Font file not found at {font_path}, utilizing Helvetica")
+                logger.warning("Font file not found at %s, utilizing Helvetica", _PROJECT_FONT_PATHS[-1])
                 self.font_name = "Helvetica"
                 self.font_bold_name = "Helvetica-Bold"
-        except Exception as e:
-            print(f"Font registration error: {e}")
+        except Exception:
+            logger.warning("Font registration error", exc_info=True)
             self.font_name = "Helvetica"
             self.font_bold_name = "Helvetica-Bold"
+        type(self)._resolved_fonts = (self.font_name, self.font_bold_name, self.registered_font)
 
     def _clean_cell_text(self, value: Any) -> str:
         if value is None:
@@ -202,33 +279,12 @@ class ExcelPdfConverter:
             
             story = []
             
-            # 使用 ReportLab 的各种样式
-            styles = getSampleStyleSheet()
-            
-            # 定义中文样式
-            normal_style = ParagraphStyle(
-                name='Normal_CN',
-                parent=styles['Normal'],
-                fontName=self.font_name,
-                fontSize=10,
-                leading=12, # 行间距
-                alignment=TA_CENTER,
-                wordWrap='CJK' # 支持中文换行
-            )
-            
-            title_style = ParagraphStyle(
-                name='Title_CN',
-                parent=styles['Heading1'],
-                fontName=self.font_bold_name,
-                fontSize=16,
-                leading=20,
-                alignment=TA_CENTER,
-                spaceAfter=20
-            )
+            # 中文正文/标题样式按字体缓存
+            normal_style, title_style = _get_base_styles(self.font_name, self.font_bold_name)
 
             # 页面模板配置
             doc = SimpleDocTemplate(
-                self.output_path,
+                self.output,
                 pagesize=A4,  # 默认初始值，后面会根据内容调整
                 leftMargin=self.margin,
                 rightMargin=self.margin,
@@ -322,49 +378,25 @@ class ExcelPdfConverter:
         """将文本数据转换为 ReportLab 的 Paragraph 对象"""
         processed_data = []
         
-        # 创建特定字号的样式
-        cell_style = ParagraphStyle(
-            'CellStyle',
-            parent=base_style,
-            fontSize=font_size,
-            leading=font_size * 1.2
-        )
-
-        header_style = ParagraphStyle(
-            'HeaderStyle',
-            parent=cell_style,
-            fontName=self.font_bold_name,
-            textColor=colors.whitesmoke
-        )
+        # 特定字号的样式按 (基础样式, 字号) 缓存
+        cell_style, header_style = _get_cell_styles(base_style, font_size, self.font_bold_name)
 
         for row_idx, row in enumerate(data):
             new_row = []
             for cell_val in row:
                 style = header_style if row_idx == 0 else cell_style
-                new_row.append(Paragraph(cell_val, style))
+                new_row.append(Paragraph(cell_val.translate(_MARKUP_ESCAPE), style))
             processed_data.append(new_row)
         return processed_data
 
     def _create_and_append_table(self, story, table_data, col_widths, font_size, table_title_suffix=""):
         """创建并添加表格到 story"""
         if table_title_suffix:
-             story.append(Paragraph(table_title_suffix, ParagraphStyle('sub', fontSize=8, textColor=colors.grey)))
+             story.append(Paragraph(table_title_suffix, _SUBTITLE_STYLE))
 
         table = Table(table_data, colWidths=col_widths, repeatRows=1)
         
-        style_cmds = [
-            ('BACKGROUND', (0, 0), (-1, 0), colors.Color(0.2, 0.4, 0.6)), # 深蓝表头
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('VALIGN', (0, 0), (-1, -1), 'TOP'), # 顶部对齐以适应换行
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-            ('FONTNAME', (0, 0), (-1, -1), self.font_name),
-            ('FONTSIZE', (0, 0), (-1, -1), font_size),
-            ('topPadding', (0, 0), (-1, -1), 4),
-            ('bottomPadding', (0, 0), (-1, -1), 4),
-        ]
-        
-        table.setStyle(TableStyle(style_cmds))
+        table.setStyle(_get_table_style(self.font_name, font_size))
         story.append(table)
         story.append(Spacer(1, 20))
 
@@ -1,3 +1,4 @@
+import logging
 import os
 import tempfile
 import time
@@ -23,6 +24,8 @@ try:
 except ImportError:
     PDFPLUMBER_AVAILABLE = False
 
+logger = logging.getLogger(__name__)
+
 class PdfToTextTool(Tool):
     """Tool for converting PDF files to text format with enhanced table support."""
     
@@ -127,7 +130,7 @@ class PdfToTextTool(Tool):
                         method_used = "PyMuPDF (Standard)"
                     doc.close()
                 except Exception as e:
-                    print(f"PyMuPDF extraction failed, falling back: {e}")
+                    logger.debug("PyMuPDF extraction failed, falling back", exc_info=True)
                     if PDFPLUMBER_AVAILABLE:
                         text_content = self._extract_with_pdfplumber(input_path)
                         method_used = "pdfplumber"
@@ -3,6 +3,7 @@ import tempfile
 from collections.abc import Generator
 from typing import Any, Dict, Optional
 import json
+import logging
 import time
 import io
 
@@ -13,7 +14,11 @@ from dify_plugin.file.file import File
 try:
     import fitz  # PyMuPDF
     from docx import Document
-    from docx.shared import Inches
+    from docx.shared import Inches, Pt, Cm, RGBColor
+    from docx.enum.table import WD_TABLE_ALIGNMENT, WD_CELL_VERTICAL_ALIGNMENT
+    from docx.enum.text import WD_ALIGN_PARAGRAPH
+    from docx.oxml import OxmlElement
+    from docx.oxml.shared import qn
     PYMUPDF_AVAILABLE = True
 except ImportError:
     PYMUPDF_AVAILABLE = False
@@ -26,6 +31,8 @@ except ImportError:
 
 PYPDF2_AVAILABLE = PYMUPDF_AVAILABLE  # 兼容性变量
 
+logger = logging.getLogger(__name__)
+
 class PdfToWordTool(Tool):
     """Tool for converting PDF documents to Word format."""
     
@@ -152,7 +159,7 @@ class PdfToWordTool(Tool):
                     # 如果有连续空单元格，标记为合并
                     if merge_end > row:
                         merged_ranges.append((row, col, merge_end, col))
-                        print(f"Detected vertical merge: ({row},{col}) to ({merge_end},{col})")
+                        logger.debug("Detected vertical merge: (%d,%d) to (%d,%d)", row, col, merge_end, col)
                         row = merge_end + 1
                     else:
                         row += 1
@@ -173,12 +180,6 @@ class PdfToWordTool(Tool):
         Returns:
             创建的Word表格对象
         """
-        from docx.shared import Pt, Cm, RGBColor
-        from docx.enum.table import WD_TABLE_ALIGNMENT, WD_CELL_VERTICAL_ALIGNMENT
-        from docx.enum.text import WD_ALIGN_PARAGRAPH
-        from docx.oxml import OxmlElement
-        from docx.oxml.shared import qn
-        
         rows = structure["rows"]
         cols = structure["cols"]
         col_widths = structure.get("col_widths", [])
@@ -191,9 +192,11 @@ class PdfToWordTool(Tool):
         
         # 2. 设置列宽（使用PDF的实际列宽）
         if col_widths and len(col_widths) == cols:
-            for col_idx, col_width in enumerate(col_widths):
-                for row in word_table.rows:
-                    row.cells[col_idx].width = col_width
+            # row.cells 每次访问都会从XML重建单元格序列，每行只取一次
+            for row in word_table.rows:
+                row_cells = row.cells
+                for col_idx, col_width in enumerate(col_widths):
+                    row_cells[col_idx].width = col_width
         
         # 3. 检测合并单元格
         merged_ranges = self._detect_merged_cells(cells, rows, cols)
@@ -206,11 +209,13 @@ class PdfToWordTool(Tool):
                     start_cell = word_table.cell(start_row, start_col)
                     end_cell = word_table.cell(end_row, end_col)
                     start_cell.merge(end_cell)
-                    print(f"Merged cells: ({start_row},{start_col}) to ({end_row},{end_col})")
-            except Exception as e:
-                print(f"Warning: Failed to merge cells ({start_row},{start_col})-({end_row},{end_col}): {e}")
+                    logger.debug("Merged cells: (%d,%d) to (%d,%d)", start_row, start_col, end_row, end_col)
+            except Exception:
+                logger.debug("Failed to merge cells (%d,%d)-(%d,%d)", start_row, start_col, end_row, end_col, exc_info=True)
         
         # 5. 填入数据和应用样式
+        # 合并后表格结构不再变化，一次性取得单元格网格；word_table.cell() 每次调用都会重建整个网格
+        table_cells = word_table._cells
         for cell_info in cells:
             row_idx = cell_info["row"]
             col_idx = cell_info["col"]
@@ -223,7 +228,7 @@ class PdfToWordTool(Tool):
             
             if row_idx < rows and col_idx < cols:
                 try:
-                    cell = word_table.cell(row_idx, col_idx)
+                    cell = table_cells[row_idx * cols + col_idx]
                     
                     # 清空并设置内容
                     cell.text = ""
@@ -263,13 +268,13 @@ class PdfToWordTool(Tool):
                             shading_elm.set(qn('w:color'), 'auto')
                             shading_elm.set(qn('w:fill'), bg_hex)
                             cell._element.get_or_add_tcPr().append(shading_elm)
-                        except Exception as e:
-                            print(f"Warning: Failed to apply bg color: {e}")
+                        except Exception:
+                            logger.debug("Failed to apply bg color", exc_info=True)
                     
                     # 设置单元格垂直对齐
                     cell.vertical_alignment = WD_CELL_VERTICAL_ALIGNMENT.CENTER
-                except Exception as e:
-                    print(f"Warning: Failed to format cell ({row_idx},{col_idx}): {e}")
+                except Exception:
+                    logger.debug("Failed to format cell (%d,%d)", row_idx, col_idx, exc_info=True)
         
         return word_table
     
@@ -283,13 +288,6 @@ class PdfToWordTool(Tool):
             table_data: 表格数据（二维列表）
             cells_info: PDF中提取的单元格格式信息（背景色等）
         """
-        from docx.shared import Pt, Inches, Cm, RGBColor
-        from docx.enum.table import WD_TABLE_ALIGNMENT, WD_CELL_VERTICAL_ALIGNMENT
-        from docx.enum.text import WD_ALIGN_PARAGRAPH
-        from docx.oxml.ns import nsmap
-        from docx.oxml import OxmlElement
-        from docx.oxml.shared import qn
-        
         # 确保所有行的列数一致（处理不规则表格）
         if not table_data:
             return
@@ -322,7 +320,7 @@ class PdfToWordTool(Tool):
                         max_line_length = max(max_line_length, length)
                     col_max_lengths[col_idx] = max(col_max_lengths[col_idx], max_line_length)
         
-        print(f"Column max lengths: {col_max_lengths}")
+        logger.debug("Column max lengths: %s", col_max_lengths)
         
         # 计算列宽（基于内容，使用Cm单位更精确）
         total_length = sum(col_max_lengths)
@@ -342,22 +340,28 @@ class PdfToWordTool(Tool):
                     width_cm = max(1.5, min(width_cm, 5.0))
                 col_widths.append(Cm(width_cm))
             
-            print(f"Column widths (cm): {[f'{w.cm:.2f}' for w in col_widths]}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Column widths (cm): %s", [round(w.cm, 2) for w in col_widths])
         else:
             # 平均分配
             col_widths = [Cm(available_width_cm / num_cols)] * num_cols
         
+        # 行和单元格网格只取一次：rows[i] 和 cell(r, c) 每次访问都会从XML重建序列
+        table_rows = list(word_table.rows)
+        table_cells = word_table._cells
+        table_cols = len(word_table.columns)
+        
         # Fill the table with data and apply formatting
         for row_idx, row in enumerate(table_data):
             # 设置行高为自动，允许扩展
             try:
-                word_table.rows[row_idx].height = None
-                word_table.rows[row_idx].height_rule = None  # 自动行高
+                table_rows[row_idx].height = None
+                table_rows[row_idx].height_rule = None  # 自动行高
             except:
                 pass
             
             for col_idx, cell_data in enumerate(row):
-                cell = word_table.cell(row_idx, col_idx)
+                cell = table_cells[row_idx * table_cols + col_idx]
                 
                 # 设置列宽
                 if col_idx < len(col_widths):
@@ -376,15 +380,15 @@ class PdfToWordTool(Tool):
                         tcMar.append(node)
                     
                     tcPr.append(tcMar)
-                except Exception as e:
-                    print(f"Warning: Failed to set cell margins: {e}")
+                except Exception:
+                    logger.debug("Failed to set cell margins", exc_info=True)
                 
                 # 清空默认内容
                 cell.text = ""
                 
                 # 添加内容
-                if cell_data is not None and str(cell_data).strip():
-                    cell_text = str(cell_data).strip()
+                cell_text = str(cell_data).strip() if cell_data is not None else ""
+                if cell_text:
                     
                     # 清除默认段落
                     if cell.paragraphs:
@@ -463,8 +467,8 @@ class PdfToWordTool(Tool):
                                 shading_elm.set(qn('w:fill'), 'E7E6E6')
                             
                             cell._element.get_or_add_tcPr().append(shading_elm)
-                        except Exception as e:
-                            print(f"Warning: Failed to apply cell shading: {e}")
+                        except Exception:
+                            logger.debug("Failed to apply cell shading", exc_info=True)
                     else:
                         # 数据行左对齐
                         p.alignment = WD_ALIGN_PARAGRAPH.LEFT
@@ -487,8 +491,8 @@ class PdfToWordTool(Tool):
                         textDirection = OxmlElement('w:textDirection')
                         textDirection.set(qn('w:val'), 'lrTb')  # left-to-right, top-to-bottom
                         tcPr.append(textDirection)
-                    except Exception as e:
-                        print(f"Warning: Failed to set cell width: {e}")
+                    except Exception:
+                        logger.debug("Failed to set cell width", exc_info=True)
         
         # Set table alignment to left
         word_table.alignment = WD_TABLE_ALIGNMENT.LEFT
@@ -543,7 +547,6 @@ class PdfToWordTool(Tool):
                     col_widths_pts.append(width)
                 
                 # 转换为厘米
-                from docx.shared import Cm
                 # PDF坐标单位是点（pt），1 pt = 0.0353 cm
                 structure["col_widths"] = [Cm(w * 0.0353) for w in col_widths_pts]
             
@@ -607,8 +610,8 @@ class PdfToWordTool(Tool):
                         "bg_color": bg_color
                     })
             
-        except Exception as e:
-            print(f"Warning: Failed to analyze table structure: {e}")
+        except Exception:
+            logger.debug("Failed to analyze table structure", exc_info=True)
         
         return structure
     
@@ -650,15 +653,16 @@ class PdfToWordTool(Tool):
                                 "bbox": bbox
                             })
                             
-                            print(f"Analyzed table: {structure['rows']} rows x {structure['cols']} cols")
-                            print(f"  Column widths: {[f'{w.cm:.2f}cm' for w in structure['col_widths']]}")
+                            logger.debug("Analyzed table: %d rows x %d cols", structure['rows'], structure['cols'])
+                            if logger.isEnabledFor(logging.DEBUG):
+                                logger.debug("  Column widths (cm): %s", [round(w.cm, 2) for w in structure['col_widths']])
                             
-                    except Exception as e:
-                        print(f"Warning: pdfplumber failed to extract table: {e}")
+                    except Exception:
+                        logger.debug("pdfplumber failed to extract table", exc_info=True)
                         continue
         
-        except Exception as e:
-            print(f"Warning: pdfplumber processing failed: {e}")
+        except Exception:
+            logger.debug("pdfplumber processing failed", exc_info=True)
         
         return tables_info
     
@@ -684,11 +688,11 @@ class PdfToWordTool(Tool):
         
         if PDFPLUMBER_AVAILABLE and pdf_path:
             try:
-                print(f"Using pdfplumber to extract tables on page {page_num + 1}")
+                logger.debug("Using pdfplumber to extract tables on page %d", page_num + 1)
                 pdfplumber_tables = self._extract_tables_with_pdfplumber(pdf_path, page_num)
                 
                 if pdfplumber_tables:
-                    print(f"pdfplumber found {len(pdfplumber_tables)} tables")
+                    logger.debug("pdfplumber found %d tables", len(pdfplumber_tables))
                     for table_info in pdfplumber_tables:
                         bbox = table_info["bbox"]
                         y_position = bbox[1]  # top coordinate
@@ -706,13 +710,13 @@ class PdfToWordTool(Tool):
                             # 记录表格区域，用于排除文本
                             table_regions.append(bbox)
                     tables_extracted = True
-            except Exception as e:
-                print(f"Warning: pdfplumber table extraction failed: {e}")
+            except Exception:
+                logger.debug("pdfplumber table extraction failed", exc_info=True)
         
         # Fallback到PyMuPDF的find_tables
         if not tables_extracted:
             try:
-                print(f"Using PyMuPDF to extract tables on page {page_num + 1}")
+                logger.debug("Using PyMuPDF to extract tables on page %d", page_num + 1)
                 tables = page.find_tables(
                     vertical_strategy="lines",
                     horizontal_strategy="lines",
@@ -724,7 +728,7 @@ class PdfToWordTool(Tool):
                 )
                 
                 if tables.tables:
-                    print(f"PyMuPDF found {len(tables.tables)} tables")
+                    logger.debug("PyMuPDF found %d tables", len(tables.tables))
                     
                     for table_idx, table in enumerate(tables.tables):
                         try:
@@ -751,7 +755,7 @@ class PdfToWordTool(Tool):
                                 cleaned_data = [row for row in cleaned_data if any(cell for cell in row)]
                                 
                                 if cleaned_data:
-                                    print(f"  Table {table_idx + 1}: {len(cleaned_data)} rows x {len(cleaned_data[0])} cols")
+                                    logger.debug("  Table %d: %d rows x %d cols", table_idx + 1, len(cleaned_data), len(cleaned_data[0]))
                                     elements.append((
                                         y_position,
                                         "table",
@@ -763,11 +767,11 @@ class PdfToWordTool(Tool):
                                     ))
                                     # 记录表格区域
                                     table_regions.append(bbox)
-                        except Exception as e:
-                            print(f"Warning: Failed to extract table {table_idx}: {e}")
+                        except Exception:
+                            logger.debug("Failed to extract table %d", table_idx, exc_info=True)
                             continue
-            except Exception as e:
-                print(f"Warning: PyMuPDF table extraction failed: {e}")
+            except Exception:
+                logger.debug("PyMuPDF table extraction failed", exc_info=True)
         
         # 步骤2：提取文本块（排除表格区域）
         try:
@@ -789,7 +793,7 @@ class PdfToWordTool(Tool):
                             bbox[1] >= table_bbox[1] - 5 and  # y0
                             bbox[3] <= table_bbox[3] + 5):    # y1
                             is_in_table = True
-                            print(f"Skipping text block in table region: {bbox}")
+                            logger.debug("Skipping text block in table region: %s", bbox)
                             break
                     
                     # 如果文本块在表格内，跳过
@@ -852,8 +856,8 @@ class PdfToWordTool(Tool):
                                 "lines": lines_data  # 保存每一行的详细信息
                             }
                         ))
-        except Exception as e:
-            print(f"Warning: Failed to extract text blocks: {e}")
+        except Exception:
+            logger.debug("Failed to extract text blocks", exc_info=True)
         
         # 步骤3：获取图片及其位置
         try:
@@ -888,11 +892,11 @@ class PdfToWordTool(Tool):
                             ))
                         
                         pix = None
-                except Exception as e:
-                    print(f"Warning: Failed to extract image {img_index}: {e}")
+                except Exception:
+                    logger.debug("Failed to extract image %d", img_index, exc_info=True)
                     continue
-        except Exception as e:
-            print(f"Warning: Failed to get images: {e}")
+        except Exception:
+            logger.debug("Failed to get images", exc_info=True)
         
         # 按照y坐标排序（从上到下）
         elements.sort(key=lambda x: x[0])
@@ -941,9 +945,6 @@ class PdfToWordTool(Tool):
                 for y_pos, element_type, element_data in elements:
                     if element_type == "text":
                         # 添加文本段落
-                        from docx.shared import Pt, RGBColor, Inches
-                        from docx.enum.text import WD_ALIGN_PARAGRAPH
-                        
                         text = element_data["text"]
                         font_size = element_data["font_size"]
                         is_bold = element_data["is_bold"]
@@ -1045,8 +1046,6 @@ class PdfToWordTool(Tool):
                     
                     elif element_type == "image":
                         # 添加图片
-                        from docx.shared import Inches as DocxInches
-                        
                         img_data = element_data["data"]
                         img_stream = io.BytesIO(img_data)
                         
@@ -1061,7 +1060,7 @@ class PdfToWordTool(Tool):
                         else:
                             doc_width = min(4.0, width / 100.0)
                         
-                        doc.add_picture(img_stream, width=DocxInches(doc_width))
+                        doc.add_picture(img_stream, width=Inches(doc_width))
                 
                 # 在页面之间添加分页符（除了最后一页）
                 if page_num < len(pdf_document) - 1:
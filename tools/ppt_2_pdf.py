@@ -2,7 +2,8 @@ import os
 import tempfile
 import io
 import math
-from typing import Any, Dict, List, Optional, Union
+from functools import lru_cache
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple, Union
 
 from dify_plugin import Tool
 from dify_plugin.file.file import File
@@ -20,6 +21,8 @@ try:
     from reportlab.platypus import Table, TableStyle, Paragraph, Frame, KeepInFrame
     from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
     from reportlab.lib.enums import TA_LEFT, TA_CENTER, TA_RIGHT, TA_JUSTIFY
+    # 样例样式表只构建一次，供所有文本框共用
+    _SAMPLE_STYLES = getSampleStyleSheet()
     DEPENDENCIES_AVAILABLE = True
 except ImportError:
     DEPENDENCIES_AVAILABLE = False
@@ -29,6 +32,42 @@ EMU_PER_INCH = 914400
 PT_PER_INCH = 72
 EMU_TO_PT = PT_PER_INCH / EMU_PER_INCH
 
+# 项目字体文件候选路径（../fonts/ 优先，其次 tools/fonts/），导入时计算一次
+_TOOLS_DIR = os.path.dirname(os.path.abspath(__file__))
+_PROJECT_FONT_PATHS = (
+    os.path.join(os.path.dirname(_TOOLS_DIR), "fonts", "chinese_font.ttc"),
+    os.path.join(_TOOLS_DIR, "fonts", "chinese_font.ttc"),
+)
+
+# 纯文本转 ReportLab 段落标记：转义特殊字符（段落文本额外把换行转为 <br/>）
+_MARKUP_ESCAPE = str.maketrans({'&': '&amp;', '<': '&lt;', '>': '&gt;'})
+_MARKUP_ESCAPE_BR = str.maketrans({'&': '&amp;', '<': '&lt;', '>': '&gt;', '\n': '<br/>'})
+
+@lru_cache(maxsize=512)
+def _get_text_style(font_name: str, font_size: float, font_color: Any, alignment: int):
+    """按 (字体, 字号, 颜色, 对齐) 复用段落样式，避免逐段落构造 ParagraphStyle"""
+    return ParagraphStyle(
+        name=f'P_{font_name}_{font_size}_{alignment}',
+        parent=_SAMPLE_STYLES['Normal'],
+        fontName=font_name,
+        fontSize=font_size,
+        textColor=font_color,
+        leading=font_size * 1.2,
+        wordWrap='CJK',
+        alignment=alignment
+    )
+
+@lru_cache(maxsize=None)
+def _get_table_styles(font_name: str):
+    """按字体缓存表格单元格样式和 TableStyle，所有幻灯片中的表格共用"""
+    cell_style = ParagraphStyle(name='TB', fontName=font_name, fontSize=9, leading=11, wordWrap='CJK')
+    table_style = TableStyle([
+        ('FONTNAME', (0, 0), (-1, -1), font_name),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ])
+    return cell_style, table_style
+
 class PptToPdfTool(Tool):
     """
     Advanced PPT to PDF Converter (Pure Python) V4.
@@ -56,17 +95,17 @@ class PptToPdfTool(Tool):
                     f.write(input_file.blob)
                 
                 output_filename = os.path.splitext(input_file.filename)[0] + ".pdf"
-                output_path = os.path.join(temp_dir, output_filename)
+                # PDF 直接写入内存，无需落盘后再读回
+                pdf_buffer = io.BytesIO()
 
-                converter = PptPdfEngine(input_path, output_path)
+                converter = PptPdfEngine(input_path, pdf_buffer)
                 result = converter.convert()
 
                 if not result["success"]:
                     yield self.create_text_message(f"Conversion Failed: {result['message']}")
                     return
 
-                with open(output_path, 'rb') as f:
-                    pdf_content = f.read()
+                pdf_content = pdf_buffer.getvalue()
 
                 yield self.create_text_message("PPT conversion successful.")
                 yield self.create_blob_message(
@@ -83,33 +122,40 @@ class PptToPdfTool(Tool):
             yield self.create_text_message(f"System Error: {str(e)}")
 
 class PptPdfEngine:
-    def __init__(self, input_path: str, output_path: str):
+    # 字体注册结果按进程缓存：(常规字体, 粗体字体)
+    _resolved_fonts: Optional[Tuple[str, str]] = None
+
+    def __init__(self, input_path: str, output: Union[str, BinaryIO]):
         self.input_path = input_path
-        self.output_path = output_path
+        # 输出目标：文件路径或二进制文件对象（如 BytesIO）
+        self.output = output
         self.font_name = "CustomChineseFont"
         self.font_bold_name = "CustomChineseFont"
+        # 按图片 SHA1 缓存 ImageReader：母版 Logo 等重复图片只解码一次
+        self._image_readers = {}
         self._register_fonts()
 
     def _register_fonts(self):
-        """字体注册逻辑"""
+        """字体注册逻辑；首次解析 TTC 后复用结果"""
+        cached = type(self)._resolved_fonts
+        if cached is not None:
+            self.font_name, self.font_bold_name = cached
+            return
         try:
-            current_dir = os.path.dirname(os.path.abspath(__file__))
-            # 假设字体在 ../fonts/
-            font_path = os.path.join(os.path.dirname(current_dir), "fonts", "chinese_font.ttc")
-            
-            if not os.path.exists(font_path):
-                font_path = os.path.join(current_dir, "fonts", "chinese_font.ttc")
+            font_path = next((path for path in _PROJECT_FONT_PATHS if os.path.exists(path)), None)
 
-            if os.path.exists(font_path):
+            if font_path:
                 pdfmetrics.registerFont(TTFont(self.font_name, font_path))
-                # 简单复用作为粗体
-                pdfmetrics.registerFont(TTFont(self.font_bold_name, font_path)) 
+                # 简单复用作为粗体（同名时无需再次解析）
+                if self.font_bold_name != self.font_name:
+                    pdfmetrics.registerFont(TTFont(self.font_bold_name, font_path))
             else:
                 self.font_name = "Helvetica"
                 self.font_bold_name = "Helvetica-Bold"
         except Exception:
             self.font_name = "Helvetica"
             self.font_bold_name = "Helvetica-Bold"
+        type(self)._resolved_fonts = (self.font_name, self.font_bold_name)
 
     def convert(self) -> Dict[str, Any]:
         try:
@@ -117,7 +163,7 @@ class PptPdfEngine:
             slide_width_pt = prs.slide_width * EMU_TO_PT
             slide_height_pt = prs.slide_height * EMU_TO_PT
             
-            c = canvas.Canvas(self.output_path, pagesize=(slide_width_pt, slide_height_pt))
+            c = canvas.Canvas(self.output, pagesize=(slide_width_pt, slide_height_pt))
             
             for slide in prs.slides:
                 self._process_slide(c, slide, slide_height_pt)
@@ -197,8 +243,10 @@ class PptPdfEngine:
         # 3.4 图片
         elif shape.shape_type == MSO_SHAPE_TYPE.PICTURE:
             try:
-                image_blob = shape.image.blob
-                img_reader = ImageReader(io.BytesIO(image_blob))
+                image = shape.image
+                img_reader = self._image_readers.get(image.sha1)
+                if img_reader is None:
+                    img_reader = self._image_readers[image.sha1] = ImageReader(io.BytesIO(image.blob))
                 c.drawImage(img_reader, x, y, width=w, height=h, mask='auto', preserveAspectRatio=True)
             except Exception:
                 pass
@@ -307,12 +355,11 @@ class PptPdfEngine:
 
     def _draw_smart_text_box(self, c: canvas.Canvas, shape: Any, x, y, w, h):
         text_frame = shape.text_frame
-        styles = getSampleStyleSheet()
         flowables = []
         
         for paragraph in text_frame.paragraphs:
             if not paragraph.text and not paragraph.runs:
-                flowables.append(Paragraph("<br/>", styles["Normal"]))
+                flowables.append(Paragraph("<br/>", _SAMPLE_STYLES["Normal"]))
                 continue
 
             font_size = 10 
@@ -330,19 +377,10 @@ class PptPdfEngine:
 
             used_font = self.font_bold_name if is_bold else self.font_name
 
-            style = ParagraphStyle(
-                name=f'P_{id(paragraph)}',
-                parent=styles['Normal'],
-                fontName=used_font,
-                fontSize=font_size,
-                textColor=font_color,
-                leading=font_size * 1.2,
-                wordWrap='CJK',
-                alignment=self._map_alignment(paragraph.alignment)
-            )
+            style = _get_text_style(used_font, font_size, font_color, self._map_alignment(paragraph.alignment))
             
             txt = paragraph.text if paragraph.text else ""
-            txt = txt.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;').replace('\n', '<br/>')
+            txt = txt.translate(_MARKUP_ESCAPE_BR)
             
             flowables.append(Paragraph(txt, style))
 
@@ -378,21 +416,17 @@ class PptPdfEngine:
         col_widths = [col.width * EMU_TO_PT for col in ppt_table.columns]
         
         processed_data = []
-        base_style = ParagraphStyle(name='TB', fontName=self.font_name, fontSize=9, leading=11, wordWrap='CJK')
+        base_style, table_style = _get_table_styles(self.font_name)
         
         for row in data:
             new_row = []
             for txt in row:
-                safe_txt = txt.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+                safe_txt = txt.translate(_MARKUP_ESCAPE)
                 new_row.append(Paragraph(safe_txt, base_style))
             processed_data.append(new_row)
 
         rl_table = Table(processed_data, colWidths=col_widths, rowHeights=row_heights)
-        rl_table.setStyle(TableStyle([
-            ('FONTNAME', (0, 0), (-1, -1), self.font_name),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ]))
+        rl_table.setStyle(table_style)
 
         t_w, t_h = rl_table.wrap(w, h)
         top_y = y + h
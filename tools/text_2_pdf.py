@@ -1,7 +1,10 @@
+import codecs
+import io
 import os
-import tempfile
-import time
+import re
+import sys
 from collections.abc import Generator
+from functools import lru_cache
 from typing import Any, Dict, Optional
 import json
 
@@ -29,9 +32,62 @@ try:
 except ImportError:
     REPORTLAB_FONT_AVAILABLE = False
 
+# Paragraph separator: a blank line, optionally containing spaces/tabs
+_PARAGRAPH_SPLIT_RE = re.compile(r'\n[ \t]*\n')
+# Escape table for characters reportlab's paragraph parser treats as markup
+_MARKUP_ESCAPE_TABLE = str.maketrans({'&': '&amp;', '<': '&lt;', '>': '&gt;'})
+# Paragraphs shorter than this are batched together, up to _MAX_PARAGRAPH_BATCH per flowable
+_SHORT_PARAGRAPH_CHARS = 200
+_MAX_PARAGRAPH_BATCH = 20
+# Text entirely below this code point (Latin script, Western punctuation) has no CJK characters
+_CJK_FIRST_CHAR = '\u2e80'
+# Body font candidates in order of preference, checked against reportlab's registry
+_FONT_PREFERENCE = ('ChineseFont', 'SimSun', 'Microsoft YaHei')
+# Bundled Chinese font (fonts/ directory, one level up from tools/)
+_PROJECT_FONT_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "fonts", "chinese_font.ttc"
+)
+# Leading bytes of TrueType/OpenType fonts and collections
+_TTF_MAGIC = (b'\x00\x01\x00\x00', b'OTTO', b'ttcf', b'true')
+
+def _has_ttf_magic(path: str) -> bool:
+    """Cheap check that a font file exists and looks like a TTF/OTF/TTC before parsing it."""
+    try:
+        with open(path, 'rb') as f:
+            return f.read(4) in _TTF_MAGIC
+    except OSError:
+        return False
+
+@lru_cache(maxsize=8)
+def _get_normal_style(font_name: str):
+    """Build the body paragraph style once per font instead of on every conversion."""
+    styles = getSampleStyleSheet()
+    try:
+        return ParagraphStyle(
+            'CustomNormal',
+            parent=styles['Normal'],
+            fontName=font_name,
+            fontSize=10,
+            leading=14,
+            spaceAfter=6,
+            wordWrap='CJK'
+        )
+    except Exception:
+        # Fallback to default styles if custom styles fail
+        return styles['Normal']
+
+@lru_cache(maxsize=8)
+def _get_latin_style(font_name: str):
+    """Word-wrapping variant of the body style, for text without CJK characters."""
+    normal_style = _get_normal_style(font_name)
+    return ParagraphStyle(normal_style.name + '_LTR', parent=normal_style, wordWrap=None)
+
 class TextToPdfTool(Tool):
     """Tool for converting text files to PDF format."""
     
+    # Body font name, resolved once per process by _get_body_font
+    _resolved_font: Optional[str] = None
+    
     def get_file_info(self, file: File) -> dict:
         """
         获取文件信息
@@ -48,10 +104,6 @@ class TextToPdfTool(Tool):
             "url": file.url
         }
         
-        # Add path attribute if it exists (for MockFile in testing)
-        if hasattr(file, 'path'):
-            file_info["path"] = file_info
-            
         return file_info
     
     def _register_chinese_fonts(self):
@@ -62,49 +114,63 @@ class TextToPdfTool(Tool):
         try:
             registered_fonts = []
             
-            # Get the directory of the current script
-            current_dir = os.path.dirname(os.path.abspath(__file__))
-            # Get the fonts directory (one level up from tools directory)
-            fonts_dir = os.path.join(os.path.dirname(current_dir), "fonts")
-            
-            # Try to register common Chinese fonts available on Windows
+            # Project Chinese font (highest priority), available on every platform
             font_paths = [
-                # Project Chinese font (highest priority)
-                ('ChineseFont', os.path.join(fonts_dir, "chinese_font.ttc")),
-                # SimSun (宋体)
-                ('SimSun', 'C:/Windows/Fonts/simsun.ttc'),
-                ('SimSun', 'C:/Windows/Fonts/simsun.ttf'),
-                # SimHei (黑体)
-                ('SimHei', 'C:/Windows/Fonts/simhei.ttf'),
-                # Microsoft YaHei (微软雅黑)
-                ('Microsoft YaHei', 'C:/Windows/Fonts/msyh.ttf'),
-                ('Microsoft YaHei', 'C:/Windows/Fonts/msyhbd.ttf'),  # Bold variant
-                # KaiTi (楷体)
-                ('KaiTi', 'C:/Windows/Fonts/kaiti.ttf'),
-                # FangSong (仿宋)
-                ('FangSong', 'C:/Windows/Fonts/simfang.ttf'),
+                ('ChineseFont', _PROJECT_FONT_PATH),
             ]
+            bold_variants = []
+            
+            # Common Chinese fonts are only present on Windows hosts
+            if sys.platform.startswith('win'):
+                font_paths.extend([
+                    # SimSun (宋体)
+                    ('SimSun', 'C:/Windows/Fonts/simsun.ttc'),
+                    ('SimSun', 'C:/Windows/Fonts/simsun.ttf'),
+                    # SimHei (黑体)
+                    ('SimHei', 'C:/Windows/Fonts/simhei.ttf'),
+                    # Microsoft YaHei (微软雅黑)
+                    ('Microsoft YaHei', 'C:/Windows/Fonts/msyh.ttf'),
+                    ('Microsoft YaHei', 'C:/Windows/Fonts/msyhbd.ttf'),  # Bold variant
+                    # KaiTi (楷体)
+                    ('KaiTi', 'C:/Windows/Fonts/kaiti.ttf'),
+                    # FangSong (仿宋)
+                    ('FangSong', 'C:/Windows/Fonts/simfang.ttf'),
+                ])
+                bold_variants.extend([
+                    ('SimSun-Bold', 'C:/Windows/Fonts/simsunb.ttf'),
+                    ('SimHei-Bold', 'C:/Windows/Fonts/simheib.ttf'),
+                    ('Microsoft YaHei-Bold', 'C:/Windows/Fonts/msyhbd.ttf'),
+                ])
+            
+            # Fonts already known to reportlab are reused instead of re-parsed
+            already_registered = set(pdfmetrics.getRegisteredFontNames())
             
             for font_name, font_path in font_paths:
                 try:
-                    if os.path.exists(font_path):
+                    if font_name in already_registered:
+                        registered_fonts.append(font_name)
+                    elif _has_ttf_magic(font_path):
                         pdfmetrics.registerFont(TTFont(font_name, font_path))
+                        already_registered.add(font_name)
                         registered_fonts.append(font_name)
+                    else:
+                        continue
+                    # The project font is always preferred for body text,
+                    # so the remaining candidates would never be used
+                    if font_name == 'ChineseFont':
+                        break
                 except Exception as e:
                     # Continue trying other fonts if one fails
                     continue
             
             # Register bold variants if available
-            bold_variants = [
-                ('SimSun-Bold', 'C:/Windows/Fonts/simsunb.ttf'),
-                ('SimHei-Bold', 'C:/Windows/Fonts/simheib.ttf'),
-                ('Microsoft YaHei-Bold', 'C:/Windows/Fonts/msyhbd.ttf'),
-            ]
-            
             for font_name, font_path in bold_variants:
                 try:
-                    if os.path.exists(font_path):
+                    if font_name in already_registered:
+                        registered_fonts.append(font_name)
+                    elif _has_ttf_magic(font_path):
                         pdfmetrics.registerFont(TTFont(font_name, font_path))
+                        already_registered.add(font_name)
                         registered_fonts.append(font_name)
                 except Exception as e:
                     # Continue trying other fonts if one fails
@@ -154,127 +220,115 @@ class TextToPdfTool(Tool):
             file_info = self.get_file_info(file)
                 
             # Validate input file format
-            if not self._validate_input_file(file_info):
+            if not self._validate_input_file(file_info, file.blob[:1024]):
                 yield self.create_text_message("Error: Invalid file format. Only text files (.txt) are supported")
                 return
                 
-            # Create temporary directory for input file
-            with tempfile.TemporaryDirectory() as temp_dir:
-                # Use the test directory as output directory
-                import os
-                output_dir = r"D:\Work\Cursor\file_converter\test"
-                os.makedirs(output_dir, exist_ok=True)
+            # Decode the uploaded text in memory instead of round-tripping it through disk
+            try:
+                text_content = file.blob.decode('utf-8')
+            except UnicodeDecodeError:
+                yield self.create_text_message("Error: Invalid file format. Text file must be UTF-8 encoded")
+                return
+            # Normalise Windows/old-Mac line endings, as text-mode open() did
+            text_content = text_content.replace('\r\n', '\n').replace('\r', '\n')
                 
-                # Save uploaded file to temp directory
-                input_path = os.path.join(temp_dir, file_info["filename"])
-                with open(input_path, 'wb') as f:
-                    f.write(file.blob)
+            # Process conversion
+            base_name = os.path.splitext(file_info["filename"])[0]
+            result = self._process_conversion(text_content, base_name)
+            
+            if result["success"]:
+                # Create output file info
+                output_files = []
+                for output_file_info in result["output_files"]:
+                    output_files.append({
+                        "filename": output_file_info["filename"],
+                        "size": len(output_file_info["content"])
+                    })
                 
-                # Update file info with the actual path
-                file_info["path"] = input_path
+                # Create JSON response
+                json_response = {
+                    "success": True,
+                    "conversion_type": "text_2_pdf",
+                    "input_file": file_info,
+                    "output_files": output_files,
+                    "message": result["message"]
+                }
                 
-                # Process conversion
-                result = self._process_conversion(input_path, temp_dir)
+                # Send text message
+                yield self.create_text_message(f"Text file converted to PDF successfully: {result['message']}")
                 
-                if result["success"]:
-                    # Create output file info
-                    output_files = []
-                    for output_file_info in result["output_files"]:
-                        output_files.append({
-                            "filename": output_file_info["filename"],
-                            "size": len(output_file_info["content"]),
-                            "path": output_file_info["path"]
-                        })
-                    
-                    # Create JSON response
-                    json_response = {
-                        "success": True,
-                        "conversion_type": "text_2_pdf",
-                        "input_file": file_info,
-                        "output_files": output_files,
-                        "message": result["message"]
-                    }
-                    
-                    # Send text message
-                    yield self.create_text_message(f"Text file converted to PDF successfully: {result['message']}")
-                    
-                    # Send JSON message
-                    yield self.create_json_message(json_response)
-                    
-                    # Send output files
-                    for file_info in result["output_files"]:
-                        try:
-                            # Use the pre-read content
-                            if "content" in file_info:
-                                yield self.create_blob_message(
-                                    blob=file_info["content"], 
-                                    meta={
-                                        "filename": file_info["filename"],
-                                        "mime_type": "application/pdf"
-                                    }
-                                )
-                            else:
-                                yield self.create_text_message(f"Error: No content available for file {file_info.get('filename', 'unknown')}")
-                        except Exception as e:
-                            yield self.create_text_message(f"Error sending file: {str(e)}")
-                    
-                    # Clean up only the temporary directory, not the output directory
+                # Send JSON message
+                yield self.create_json_message(json_response)
+                
+                # Send output files, dropping each file's content once it has been handed off
+                for output_file_info in result["output_files"]:
                     try:
-                        import shutil
-                        # Only clean up the temp directory, not the output directory
-                        # The temp directory will be automatically cleaned up by the context manager
-                        pass
+                        content = output_file_info.pop("content", None)
+                        if content is not None:
+                            yield self.create_blob_message(
+                                blob=content, 
+                                meta={
+                                    "filename": output_file_info["filename"],
+                                    "mime_type": "application/pdf"
+                                }
+                            )
+                        else:
+                            yield self.create_text_message(f"Error: No content available for file {output_file_info.get('filename', 'unknown')}")
                     except Exception as e:
-                        # Ignore cleanup errors
-                        pass
-                else:
-                    # Send error message
-                    yield self.create_text_message(f"Conversion failed: {result['message']}")
+                        yield self.create_text_message(f"Error sending file: {str(e)}")
+            else:
+                # Send error message
+                yield self.create_text_message(f"Conversion failed: {result['message']}")
                     
         except Exception as e:
             yield self.create_text_message(f"Error during conversion: {str(e)}")
     
-    def _validate_input_file(self, file_info: dict) -> bool:
+    def _validate_input_file(self, file_info: dict, content_prefix: Optional[bytes] = None) -> bool:
         """Validate if the input file is a valid text file."""
         # Check file extension
         if not file_info["extension"].lower().endswith('.txt'):
             return False
             
-        # Check if file is readable as text
-        if "path" in file_info:
+        # Check if the first bytes decode as UTF-8 text, without touching disk
+        if content_prefix is not None:
             try:
-                with open(file_info["path"], 'r', encoding='utf-8') as f:
-                    f.read(1024)  # Try to read first 1KB
+                # Incremental decode tolerates a multi-byte character cut at the prefix boundary
+                codecs.getincrementaldecoder('utf-8')().decode(content_prefix, final=False)
                 return True
-            except Exception:
+            except UnicodeDecodeError:
                 return False
         
-        # If path not available, just check file extension
+        # If content not available, just check file extension
         return True
     
-    def _process_conversion(self, input_path: str, temp_dir: str) -> Dict[str, Any]:
+    def _get_body_font(self) -> str:
+        """Register fonts on first use and return the cached body font name."""
+        cls = type(self)
+        if cls._resolved_font is None:
+            # Determine which fonts to use based on registration success
+            if self._register_chinese_fonts():
+                # Use the first available Chinese font in order of preference
+                registered = set(pdfmetrics.getRegisteredFontNames())
+                cls._resolved_font = next((f for f in _FONT_PREFERENCE if f in registered), 'SimHei')
+            else:
+                # Use reportlab's built-in fonts
+                cls._resolved_font = 'Helvetica'
+        return cls._resolved_font
+    
+    def _process_conversion(self, text_content: str, base_name: str) -> Dict[str, Any]:
         """Process the text to PDF conversion using reportlab."""
         output_files = []
         
-        # Generate output file path
-        base_name = os.path.splitext(os.path.basename(input_path))[0]
-        output_path = os.path.join(temp_dir, f"{base_name}.pdf")
-        
         # Check if required libraries are available
         if not REPORTLAB_AVAILABLE:
             return {"success": False, "message": "Required library (reportlab) is not available. Please install it using: pip install reportlab"}
         
         try:
-            # Register Chinese fonts for reportlab
-            chinese_fonts_registered = self._register_chinese_fonts()
-            
-            # Read text content from file
-            with open(input_path, 'r', encoding='utf-8') as f:
-                text_content = f.read()
-            
-            # Create PDF document
+            # Create PDF document, built straight into memory
+            pdf_buffer = io.BytesIO()
             pdf_doc = SimpleDocTemplate(
-                output_path,
+                pdf_buffer,
                 pagesize=A4,
                 rightMargin=72,
                 leftMargin=72,
@@ -282,93 +336,48 @@ class TextToPdfTool(Tool):
                 bottomMargin=18
             )
             
-            # Get styles
-            styles = getSampleStyleSheet()
-            
-            # Determine which fonts to use based on registration success
-            if chinese_fonts_registered:
-                # Try to use Chinese fonts in order of preference
-                try:
-                    # Check if ChineseFont is available (project font)
-                    pdfmetrics.getFont("ChineseFont")
-                    normal_font = 'ChineseFont'
-                except:
-                    try:
-                        # Check if SimSun is available
-                        pdfmetrics.getFont("SimSun")
-                        normal_font = 'SimSun'
-                    except:
-                        try:
-                            # Check if Microsoft YaHei is available
-                            pdfmetrics.getFont("Microsoft YaHei")
-                            normal_font = 'Microsoft YaHei'
-                        except:
-                            # Fallback to any available Chinese font
-                            normal_font = 'SimHei'
-            else:
-                # Use reportlab's built-in fonts
-                normal_font = 'Helvetica'
-            
-            # Create custom styles for text
-            try:
-                normal_style = ParagraphStyle(
-                    'CustomNormal',
-                    parent=styles['Normal'],
-                    fontName=normal_font,
-                    fontSize=10,
-                    leading=14,
-                    spaceAfter=6,
-                    wordWrap='CJK'
-                )
-            except Exception:
-                # Fallback to default styles if custom styles fail
-                normal_style = styles['Normal']
+            # Styles depend only on the resolved font, so they are cached per font
+            body_font = self._get_body_font()
+            normal_style = _get_normal_style(body_font)
+            # Non-CJK text wraps at word boundaries, skipping reportlab's per-character CJK breaker
+            latin_style = _get_latin_style(body_font)
             
             # Build PDF content
             story = []
             
-            # Split text into paragraphs and add to story
-            paragraphs = text_content.split('\n\n')
+            # Split text into stripped, non-empty paragraphs and add to story
+            paragraphs = (p for p in map(str.strip, _PARAGRAPH_SPLIT_RE.split(text_content)) if p)
+            # Short paragraphs are coalesced into one Paragraph (joined by blank
+            # lines) to cut per-flowable layout overhead on large inputs
+            batch = []
+            
+            def flush_batch():
+                if batch:
+                    batch_text = '<br/><br/>'.join(batch)
+                    style = latin_style if max(batch_text) < _CJK_FIRST_CHAR else normal_style
+                    story.extend((Paragraph(batch_text, style), Spacer(1, 6)))
+                    batch.clear()
+            
             for paragraph_text in paragraphs:
-                if paragraph_text.strip():
-                    try:
-                        # Add paragraph to story
-                        story.append(Paragraph(paragraph_text.strip(), normal_style))
-                        story.append(Spacer(1, 6))
-                    except Exception as e:
-                        # Fallback for text that can't be processed
-                        story.append(Paragraph(paragraph_text.strip(), normal_style))
-                        story.append(Spacer(1, 6))
+                # Plain text must not be interpreted as reportlab markup
+                paragraph_text = paragraph_text.translate(_MARKUP_ESCAPE_TABLE)
+                is_short = len(paragraph_text) < _SHORT_PARAGRAPH_CHARS
+                if not is_short:
+                    flush_batch()
+                batch.append(paragraph_text)
+                if not is_short or len(batch) >= _MAX_PARAGRAPH_BATCH:
+                    flush_batch()
+            flush_batch()
+            # A spacer after the last paragraph only adds an extra flowable to lay out
+            if story:
+                story.pop()
             
             # Build PDF
             pdf_doc.build(story)
-            
-            # Wait for file to be fully written
-            time.sleep(2)
-            
-            # Check if file exists and has content
-            if not os.path.exists(output_path):
-                return {"success": False, "message": "Output PDF file was not created"}
-                
-            if os.path.getsize(output_path) == 0:
-                return {"success": False, "message": "Output PDF file is empty"}
-            
-            # Try multiple times to read the file
-            file_content = None
-            for attempt in range(3):
-                try:
-                    with open(output_path, 'rb') as f:
-                        file_content = f.read()
-                    break
-                except Exception as e:
-                    if attempt < 2:
-                        time.sleep(2)
-                    else:
-                        return {"success": False, "message": f"Error reading converted file: {str(e)}"}
+            file_content = pdf_buffer.getvalue()
             
             if file_content:
                 output_files.append({
-                    "path": output_path,
                     "content": file_content,
                     "filename": f"{base_name}.pdf"
                 })
@@ -378,7 +387,7 @@ class TextToPdfTool(Tool):
                     "output_files": output_files
                 }
             else:
-                return {"success": False, "message": "Failed to read converted file after multiple attempts"}
+                return {"success": False, "message": "Output PDF file is empty"}
                     
         except Exception as e:
             return {"success": False, "message": f"Error converting text to PDF: {str(e)}"}
\ No newline at end of file
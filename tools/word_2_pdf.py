@@ -1,11 +1,20 @@
+import atexit
+import copy
 import os
 import tempfile
 import io
 import re
+import shutil
+import subprocess
+import sys
+import threading
 import uuid
 from typing import Any, Dict, List, Tuple, Optional
 from collections.abc import Generator
 from collections import defaultdict
+from functools import lru_cache
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # Dify Plugin Imports
 from dify_plugin import Tool
@@ -15,11 +24,8 @@ from dify_plugin.file.file import File
 # --- 依赖库导入 ---
 try:
     from docx import Document
-    from docx.oxml.text.paragraph import CT_P
-    from docx.oxml.table import CT_Tbl
-    from docx.table import Table as DocxTable
-    from docx.text.paragraph import Paragraph as DocxParagraph
     from docx.oxml.ns import qn
+    from docx.opc.constants import RELATIONSHIP_TYPE as RT
     
     from reportlab.pdfgen import canvas
     from reportlab.lib import colors
@@ -29,23 +35,268 @@ try:
     from reportlab.lib.enums import TA_LEFT, TA_CENTER, TA_RIGHT, TA_JUSTIFY
     from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
     from reportlab.platypus import (
-        SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image as RLImage, PageBreak
+        SimpleDocTemplate, Table, TableStyle, Paragraph, Image as RLImage, PageBreak
     )
-    from reportlab.lib.utils import ImageReader
     from reportlab.pdfbase import pdfmetrics
     from reportlab.pdfbase.ttfonts import TTFont
     from reportlab.pdfbase.cidfonts import UnicodeCIDFont
 except ImportError as e:
     raise ImportError(f"Environment Error: {e}. Please ensure requirements.txt is installed.")
 
+# numbering.xml 解析用到的限定名，预先计算避免每次调用 qn()
+_QN_NUM_PR = qn('w:numPr')
+_QN_NUM_ID = qn('w:numId')
+_QN_ILVL = qn('w:ilvl')
+_QN_ABSTRACT_NUM_ID = qn('w:abstractNumId')
+_QN_LVL = qn('w:lvl')
+_QN_NUM_FMT = qn('w:numFmt')
+_QN_LVL_TEXT = qn('w:lvlText')
+_QN_ABSTRACT_NUM = qn('w:abstractNum')
+_QN_NUM = qn('w:num')
+_QN_VAL = qn('w:val')
+
+# 正文块级元素：由 lxml 在 C 层按标签过滤
+_QN_P = qn('w:p')
+_QN_TBL = qn('w:tbl')
+
+# 段落正文直接通过 lxml 读取，避免为每个段落构造 python-docx 对象
+_QN_T = qn('w:t')
+_QN_R = qn('w:r')
+_QN_R_PR = qn('w:rPr')
+_QN_HYPERLINK = qn('w:hyperlink')
+_QN_BR = qn('w:br')
+_QN_TYPE = qn('w:type')
+# 代表固定字符的 run 子元素，与 python-docx 的映射一致
+_RUN_CHARS = {
+    qn('w:tab'): '\t',
+    qn('w:ptab'): '\t',
+    qn('w:cr'): '\n',
+    qn('w:noBreakHyphen'): '-',
+}
+_QN_P_PR = qn('w:pPr')
+_QN_P_STYLE = qn('w:pStyle')
+_QN_JC = qn('w:jc')
+
+# lvlText 中的级别占位符（%1 ~ %9）
+_LVL_PLACEHOLDER_RE = re.compile(r'%([1-9])')
+
 # --- 辅助工具 ---
+_CN_DIGITS = ("零", "一", "二", "三", "四", "五", "六", "七", "八", "九")
+_CN_TEENS = {i: "十" + (_CN_DIGITS[i % 10] if i % 10 else "") for i in range(10, 20)}
+
 def int_to_chinese(n):
     """数字转中文，用于还原中文列表"""
-    chars = ["零", "一", "二", "三", "四", "五", "六", "七", "八", "九"]
-    if n < 10: return chars[n]
-    if n < 20: return "十" + (chars[n % 10] if n % 10 != 0 else "")
+    if n < 10: return _CN_DIGITS[n]
+    if n < 20: return _CN_TEENS[n]
     return str(n)
 
+# DrawingML 图片引用的标签/属性名
+_BLIP_TAG = '{http://schemas.openxmlformats.org/drawingml/2006/main}blip'
+_EMBED_ATTR = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}embed'
+_EXTENT_TAG = '{http://schemas.openxmlformats.org/drawingml/2006/wordprocessingDrawing}extent'
+# 兼容性标记：mc:AlternateContent 内的 mc:Choice 与其 mc:Fallback 副本
+_MC_ALTERNATE_CONTENT = '{http://schemas.openxmlformats.org/markup-compatibility/2006}AlternateContent'
+_MC_CHOICE = '{http://schemas.openxmlformats.org/markup-compatibility/2006}Choice'
+# 图片显示尺寸：EMU 换算为 pt，宽度不超过版心
+_PT_PER_EMU = 72 / 914400
+_MAX_IMAGE_WIDTH = 16 * cm
+
+# 文件名中不允许出现的字符
+_UNSAFE_NAME_RE = re.compile(r'[\\/*?:"<>|]')
+
+# 段落文本转义表：一次 translate 替代三次 replace
+_XML_ESCAPE = str.maketrans({'&': '&amp;', '<': '&lt;', '>': '&gt;'})
+
+# reportlab 的基础样式表只需构建一次
+_SAMPLE_STYLES = getSampleStyleSheet()
+
+@lru_cache(maxsize=None)
+def _get_paragraph_styles(base_font, bold_font):
+    """按字体组合缓存段落样式，避免每次转换（及每个段落/单元格）重复创建 ParagraphStyle"""
+    style_norm = ParagraphStyle(
+        'MyNormal', parent=_SAMPLE_STYLES['Normal'],
+        fontName=base_font, fontSize=10.5, leading=16,
+        wordWrap='CJK', spaceAfter=6, alignment=TA_JUSTIFY
+    )
+    return {
+        "normal": style_norm,
+        "h1": ParagraphStyle(
+            'MyH1', parent=style_norm,
+            fontName=bold_font, fontSize=16, leading=22,
+            spaceBefore=18, spaceAfter=12, keepWithNext=True
+        ),
+        "h2": ParagraphStyle(
+            'MyH2', parent=style_norm,
+            fontName=bold_font, fontSize=14, leading=20,
+            spaceBefore=12, spaceAfter=6, keepWithNext=True
+        ),
+        "h3": ParagraphStyle(
+            'MyH3', parent=style_norm,
+            fontName=bold_font, fontSize=12, leading=18,
+            spaceBefore=6, spaceAfter=6, keepWithNext=True
+        ),
+        "center": ParagraphStyle('C', parent=style_norm, alignment=TA_CENTER),
+        "right": ParagraphStyle('R', parent=style_norm, alignment=TA_RIGHT),
+        "table_cell": ParagraphStyle('TC', parent=style_norm, fontSize=9, leading=12),
+    }
+
+# 码位低于此值的文本（拉丁字母、西文标点等）不含 CJK 字符
+_CJK_FIRST_CHAR = '\u2e80'
+
+@lru_cache(maxsize=None)
+def _ltr_style(style):
+    """样式的按词换行变体（按样式对象缓存）"""
+    return ParagraphStyle(style.name + '_LTR', parent=style, wordWrap=None)
+
+def _wrap_style(style, text):
+    """不含 CJK 字符的文本改用按词换行，省去 reportlab 逐字符的 CJK 断行"""
+    return _ltr_style(style) if text and max(text) < _CJK_FIRST_CHAR else style
+
+@lru_cache(maxsize=None)
+def _get_table_style(base_font):
+    """按字体缓存表格样式；setStyle 只读取其中的命令，所有表格可共用同一对象"""
+    return TableStyle([
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
+        ('FONTNAME', (0, 0), (-1, -1), base_font),
+        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+        ('LEFTPADDING', (0, 0), (-1, -1), 4),
+        ('RIGHTPADDING', (0, 0), (-1, -1), 4),
+        ('BACKGROUND', (0, 0), (-1, 0), colors.whitesmoke),
+    ])
+
+@lru_cache(maxsize=256)
+def _scale_col_widths(grid_widths, total_width_cm):
+    """按 tblGrid 宽度比例换算列宽；同一网格签名（如模板化的重复表格）只计算一次"""
+    total = sum(grid_widths)
+    if total <= 0: return None
+    return tuple((w/total)*total_width_cm*cm for w in grid_widths)
+
+def _classify_heading(style_name):
+    """按样式名判断标题级别，返回 (样式键, 书签层级)，非标题返回 None"""
+    if 'heading 1' in style_name: return ("h1", 0)
+    if 'heading 2' in style_name: return ("h2", 1)
+    if 'heading 3' in style_name: return ("h3", 2)
+    if 'title' in style_name: return ("h1", 0)
+    return None
+
+def _load_image(blob):
+    """构建按页宽缩放的 RLImage；只读取图片头获取尺寸，像素在 build 绘制时才解码"""
+    # RLImage 读取一次图片头即可得到尺寸，无需再单独构造 ImageReader
+    img = RLImage(io.BytesIO(blob))
+    w = img.drawWidth
+    if w > _MAX_IMAGE_WIDTH:
+        img.drawHeight = img.drawHeight * (_MAX_IMAGE_WIDTH / w); img.drawWidth = _MAX_IMAGE_WIDTH
+    return img
+
+# 字体注册结果按进程缓存，避免每次转换重复探测文件系统和解析 TTF
+_FONT_MAP_CACHE = None
+_FONT_LOCK = threading.Lock()
+
+def _extent_size(extent):
+    """wp:extent 的 EMU 尺寸换算为显示尺寸 (pt)，按版心宽度缩放；缺失或非法时返回 None"""
+    if extent is None: return None
+    try:
+        w = int(extent.get('cx')) * _PT_PER_EMU
+        h = int(extent.get('cy')) * _PT_PER_EMU
+    except (TypeError, ValueError):
+        return None
+    if w <= 0 or h <= 0: return None
+    if w > _MAX_IMAGE_WIDTH:
+        h = h * (_MAX_IMAGE_WIDTH / w); w = _MAX_IMAGE_WIDTH
+    return w, h
+
+def _collect_images(node, images):
+    """收集 node 子树中的图片 (rId, 显示尺寸)"""
+    # wp:extent 在文档顺序上先于同一图片的 a:blip
+    extent = None
+    for item in node.iter(_EXTENT_TAG, _BLIP_TAG):
+        if item.tag == _EXTENT_TAG:
+            extent = item
+        else:
+            images.append((item.get(_EMBED_ATTR), _extent_size(extent)))
+            extent = None
+
+def _scan_paragraph(p_element):
+    """单次遍历段落，收集文本和图片 (rId, 显示尺寸)，返回 (text, images)。
+    文本与 python-docx 的 paragraph.text 一致：只取段落直属的 w:r 及超链接内的 w:r，
+    制表符、换行、不间断连字符映射为对应字符；文本框等嵌套内容（含 mc:Fallback 副本）不计入正文"""
+    parts = []
+    images = []
+    for child in p_element:
+        tag = child.tag
+        if tag == _QN_R:
+            runs = (child,)
+        elif tag == _QN_HYPERLINK:
+            runs = child.iterchildren(_QN_R)
+        else:
+            _collect_images(child, images)
+            continue
+        for run in runs:
+            for item in run:
+                tag = item.tag
+                if tag == _QN_T:
+                    parts.append(item.text or '')
+                elif tag == _QN_BR:
+                    # 分页符、分栏符不产生文本
+                    if item.get(_QN_TYPE, 'textWrapping') == 'textWrapping': parts.append('\n')
+                elif tag in _RUN_CHARS:
+                    parts.append(_RUN_CHARS[tag])
+                elif tag == _MC_ALTERNATE_CONTENT:
+                    # mc:Fallback 是 mc:Choice 内容的旧格式副本，只看 mc:Choice，避免重复
+                    choice = item.find(_MC_CHOICE)
+                    if choice is not None: _collect_images(choice, images)
+                elif tag != _QN_R_PR and len(item):
+                    # w:drawing / w:pict 中的图片
+                    _collect_images(item, images)
+    return ''.join(parts), images
+
+def _cell_text(tc):
+    """直接从 w:tc 读取单元格文本（段落间以换行连接），不构造 python-docx 的 _Cell"""
+    # 每个段落与正文段落共用同一套 run 文本规则（制表符、换行等）
+    return '\n'.join(_scan_paragraph(p)[0] for p in tc.iterchildren(_QN_P))
+
+# 本地中文字体候选 (文件名, 注册名) 及查找目录，导入时确定
+_FONT_CANDIDATES = (
+    ("msyh.ttf", "MicrosoftYaHei"),
+    ("simsun.ttc", "SimSun"),
+    ("simhei.ttf", "SimHei"),
+)
+_FONT_SEARCH_DIRS = (
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "fonts"),
+    "/usr/share/fonts/truetype",
+)
+# Windows 字体目录只在 Windows 主机上查找
+if sys.platform.startswith('win'): _FONT_SEARCH_DIRS += ("C:\\Windows\\Fonts",)
+
+# 批量转换时的默认并发数
+_DEFAULT_MAX_WORKERS = 4
+
+# 本机装有 LibreOffice 时优先用其原生引擎排版，失败或不可用时回退到 ReportLab
+_SOFFICE_PATH = shutil.which("soffice") or shutil.which("libreoffice")
+_SOFFICE_TIMEOUT = 120
+# 用户配置目录按需用 mkdtemp 私有创建（0700），空闲后留给下次调用以保持热启动，进程退出时删除。
+# 同一配置目录不能被两个 soffice 同时使用，故每个并发调用各取一个，互不阻塞
+_SOFFICE_IDLE_PROFILES = []
+_SOFFICE_ALL_PROFILES = []
+_SOFFICE_PROFILE_LOCK = threading.Lock()
+
+def _acquire_soffice_profile():
+    """取一个空闲的 LibreOffice 配置目录，没有则新建"""
+    with _SOFFICE_PROFILE_LOCK:
+        if _SOFFICE_IDLE_PROFILES: return _SOFFICE_IDLE_PROFILES.pop()
+        profile_dir = tempfile.mkdtemp(prefix="lo_profile_")
+        _SOFFICE_ALL_PROFILES.append(profile_dir)
+        return profile_dir
+
+def _release_soffice_profile(profile_dir):
+    with _SOFFICE_PROFILE_LOCK:
+        _SOFFICE_IDLE_PROFILES.append(profile_dir)
+
+@atexit.register
+def _remove_soffice_profiles():
+    for profile_dir in _SOFFICE_ALL_PROFILES:
+        shutil.rmtree(profile_dir, ignore_errors=True)
+
 class BookmarkParagraph(Paragraph):
     """
     自定义段落组件：
@@ -55,7 +306,14 @@ class BookmarkParagraph(Paragraph):
     def __init__(self, text, style, level=0):
         super().__init__(text, style)
         self.bookmark_level = level
-        self.key = str(uuid.uuid4())
+        self._key = None
+
+    @property
+    def key(self):
+        """书签锚点名，首次绘制时才生成"""
+        if self._key is None:
+            self._key = uuid.uuid4().hex
+        return self._key
 
     def draw(self):
         super().draw()
@@ -80,7 +338,11 @@ class DocxNumberingEngine:
         self.doc = doc
         self.num_dict = {} 
         self.abstract_dict = {} 
-        self.counters = {}      
+        self.counters = defaultdict(int)
+        # abstractNumId -> w:abstractNum 元素，级别定义在首次被段落引用时才展开
+        self._abstract_elements = {}
+        # num_id -> {ilvl: (fmt_kind, template, refs, deeper)}，按需解析后缓存，逐段落只需一次查找
+        self._resolved = {}
         self._parse_numbering_xml()
 
     def _parse_numbering_xml(self):
@@ -88,160 +350,277 @@ class DocxNumberingEngine:
             numbering_part = self.doc.part.numbering_part
             if not numbering_part: return
             element = numbering_part.element
-            for abstract_num in element.findall(qn('w:abstractNum')):
-                abs_id = abstract_num.get(qn('w:abstractNumId'))
-                levels = {}
-                for lvl in abstract_num.findall(qn('w:lvl')):
-                    ilvl = int(lvl.get(qn('w:ilvl')))
-                    num_fmt = "decimal"
-                    fmt_node = lvl.find(qn('w:numFmt'))
-                    if fmt_node is not None: num_fmt = fmt_node.get(qn('w:val'))
-                    lvl_text = "%1."
-                    txt_node = lvl.find(qn('w:lvlText'))
-                    if txt_node is not None: lvl_text = txt_node.get(qn('w:val'))
-                    levels[ilvl] = (num_fmt, lvl_text)
-                self.abstract_dict[abs_id] = levels
-            for num in element.findall(qn('w:num')):
-                num_id = num.get(qn('w:numId'))
-                abs_ref = num.find(qn('w:abstractNumId'))
+            # 套用大型模板的文档可能带有上千个未被使用的 abstractNum，这里只建立索引
+            for abstract_num in element.iterchildren(_QN_ABSTRACT_NUM):
+                self._abstract_elements[abstract_num.get(_QN_ABSTRACT_NUM_ID)] = abstract_num
+            for num in element.iterchildren(_QN_NUM):
+                num_id = num.get(_QN_NUM_ID)
+                abs_ref = num.find(_QN_ABSTRACT_NUM_ID)
                 if abs_ref is not None:
-                    self.num_dict[num_id] = abs_ref.get(qn('w:val'))
+                    self.num_dict[num_id] = abs_ref.get(_QN_VAL)
         except Exception:
             pass
 
-    def get_numbering_text(self, paragraph) -> str:
-        """获取精准的序号字符串"""
-        text = paragraph.text.strip()
-        if not text: return "" 
-        try:
-            pPr = paragraph._element.pPr
-            if pPr is None or pPr.numPr is None: return ""
-            
-            num_id_node = pPr.numPr.find(qn('w:numId'))
-            if num_id_node is None: return ""
-            num_id = num_id_node.get(qn('w:val'))
-            
-            ilvl_node = pPr.numPr.find(qn('w:ilvl'))
-            ilvl = int(ilvl_node.get(qn('w:val'))) if ilvl_node is not None else 0
-            
-            abstract_id = self.num_dict.get(num_id)
-            if not abstract_id: return ""
-            level_def = self.abstract_dict.get(abstract_id, {}).get(ilvl)
-            if not level_def: return ""
-            
-            num_fmt, lvl_text = level_def
-            counter_key = (num_id, ilvl)
-            if counter_key not in self.counters: self.counters[counter_key] = 0
-            self.counters[counter_key] += 1
-            val = self.counters[counter_key]
-            
-            if num_fmt == 'bullet': return "• "
-            if 'chinese' in num_fmt.lower(): return lvl_text.replace(f'%{ilvl+1}', int_to_chinese(val))
-            return lvl_text.replace(f'%{ilvl+1}', str(val)) + " "
-        except Exception:
-            return ""
+    def _get_levels(self, num_id):
+        """返回 num_id 对应的级别定义，首次访问时从 abstractNum 展开并缓存"""
+        levels = self._resolved.get(num_id)
+        if levels is not None: return levels
+        abs_id = self.num_dict.get(num_id)
+        levels = self.abstract_dict.get(abs_id) if abs_id else {}
+        if levels is None:
+            levels = {}
+            abstract_num = self._abstract_elements.get(abs_id)
+            if abstract_num is not None:
+                try:
+                    levels = self._parse_levels(abstract_num)
+                except Exception:
+                    levels = {}
+            self.abstract_dict[abs_id] = levels
+        self._resolved[num_id] = levels
+        return levels
+
+    @staticmethod
+    def _parse_levels(abstract_num):
+        kinds = {}
+        texts = {}
+        for lvl in abstract_num.iterchildren(_QN_LVL):
+            ilvl = int(lvl.get(_QN_ILVL))
+            num_fmt = "decimal"
+            fmt_node = lvl.find(_QN_NUM_FMT)
+            if fmt_node is not None: num_fmt = fmt_node.get(_QN_VAL)
+            lvl_text = "%1."
+            txt_node = lvl.find(_QN_LVL_TEXT)
+            if txt_node is not None: lvl_text = txt_node.get(_QN_VAL)
+            # 缺少取值的级别在此一次性剔除，取序号时无需再做异常保护
+            if num_fmt is None or lvl_text is None: continue
+            # 序号格式分类和占位符在解析时确定，逐段落不再做字符串判断
+            if num_fmt == 'bullet': fmt_kind = 'bullet'
+            elif 'chinese' in num_fmt.lower(): fmt_kind = 'chinese'
+            else: fmt_kind = None
+            kinds[ilvl] = fmt_kind
+            texts[ilvl] = lvl_text
+        # lvlText 预编译为 str.format 模板，refs 记录各占位符引用的级别及其是否为中文格式，
+        # 多级序号（如 "%1.%2."）一次 format 即可代入所有上级计数；deeper 为递增时需重置的下级
+        levels = {}
+        for ilvl, lvl_text in texts.items():
+            template = _LVL_PLACEHOLDER_RE.sub('{}', lvl_text.replace('{', '{{').replace('}', '}}'))
+            refs = tuple(
+                (int(n) - 1, kinds.get(int(n) - 1) == 'chinese')
+                for n in _LVL_PLACEHOLDER_RE.findall(lvl_text)
+            )
+            deeper = tuple(k for k in texts if k > ilvl)
+            levels[ilvl] = (kinds[ilvl], template, refs, deeper)
+        return levels
+
+    def get_numbering_text(self, pPr, text: str) -> str:
+        """获取精准的序号字符串（pPr 为段落的 w:pPr 元素，可为 None；text 为其已去空白的文本）"""
+        if not text or pPr is None: return ""
+        numPr = pPr.find(_QN_NUM_PR)
+        if numPr is None: return ""
+        
+        num_id_node = numPr.find(_QN_NUM_ID)
+        if num_id_node is None: return ""
+        num_id = num_id_node.get(_QN_VAL)
+        
+        levels = self._get_levels(num_id)
+        if not levels: return ""
+        
+        ilvl = 0
+        ilvl_node = numPr.find(_QN_ILVL)
+        if ilvl_node is not None:
+            try:
+                ilvl = int(ilvl_node.get(_QN_VAL))
+            except (TypeError, ValueError):
+                return ""
+        
+        level_def = levels.get(ilvl)
+        if not level_def: return ""
+        
+        fmt_kind, template, refs, deeper = level_def
+        counters = self.counters
+        counter_key = (num_id, ilvl)
+        counters[counter_key] += 1
+        # 与 Word 一致：上级序号递增后，下级重新从头计数
+        for lower in deeper: counters.pop((num_id, lower), None)
+        
+        if fmt_kind == 'bullet': return "• "
+        # 尚未出现过的上级按起始值 1 显示
+        nums = [
+            int_to_chinese(counters.get((num_id, ref)) or 1) if is_cn else str(counters.get((num_id, ref)) or 1)
+            for ref, is_cn in refs
+        ]
+        label = template.format(*nums)
+        return label if fmt_kind == 'chinese' else label + " "
 
 class WordToPdfTool(Tool):
     def _invoke(self, tool_parameters: dict[str, Any]) -> Generator[ToolInvokeMessage, None, None]:
-        file = tool_parameters.get("input_file")
-        if not file or not file.extension.lower().endswith('.docx'):
+        # input_file 与 input_files 二选一：单文件转换或批量转换
+        input_file = tool_parameters.get("input_file")
+        input_files = tool_parameters.get("input_files") or []
+        if input_file and input_files:
+            yield self.create_text_message("Error: Provide either 'input_file' or 'input_files', not both.")
+            return
+        if not input_file and not input_files:
+            yield self.create_text_message("Error: Missing required parameter: provide 'input_file' or 'input_files'.")
+            return
+        files = [input_file] if input_file else list(input_files)
+        if any(not f.extension.lower().endswith('.docx') for f in files):
             yield self.create_text_message("Error: Please upload a .docx file.")
             return
 
-        with tempfile.TemporaryDirectory() as temp_dir:
-            try:
-                # --- 1. 文件名处理 ---
-                original_name = file.filename
-                safe_name = re.sub(r'[\\/*?:"<>|]', "", original_name)
-                if not safe_name or len(safe_name) < 2: 
-                    safe_name = "document.docx"
-                if not safe_name.lower().endswith('.docx'): 
-                    safe_name += '.docx'
-                
+        if len(files) == 1 or _SOFFICE_PATH:
+            # 取舍：装有 LibreOffice 时批量文件也逐个转换。插件运行时经 gevent 打补丁，
+            # 在线程池工作线程里启动子进程会挂起，因此放弃 ReportLab 批量模式的线程池并行；
+            # 不同调用之间各用独立的配置目录，仍可并发
+            for f in files:
+                yield from self._emit_result(*self._convert_file(f))
+            return
+
+        # 多个文件并行转换，按完成顺序返回结果
+        try:
+            max_workers = int(tool_parameters.get("max_workers") or _DEFAULT_MAX_WORKERS)
+        except (TypeError, ValueError):
+            max_workers = _DEFAULT_MAX_WORKERS
+        max_workers = max(1, min(max_workers, len(files), os.cpu_count() or 1, 8))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(self._convert_file, f) for f in files]
+            # 每个文件完成即发送并释放结果，不在内存中同时保留全部 PDF
+            for future in as_completed(futures):
+                result = future.result()
+                futures.remove(future)
+                yield from self._emit_result(*result)
+                del future, result
+
+    def _emit_result(self, safe_name, pdf_content, msg):
+        """把单个文件的转换结果转为消息"""
+        if pdf_content:
+            output_filename = os.path.splitext(safe_name)[0] + ".pdf"
+            yield self.create_json_message({
+                "status": "success",
+                "source_file": safe_name,
+                "output_file": output_filename
+            })
+            yield self.create_blob_message(
+                blob=pdf_content,
+                meta={
+                    "filename": output_filename, 
+                    "mime_type": "application/pdf"
+                }
+            )
+        elif msg.startswith("Error: "):
+            yield self.create_text_message(msg)
+        else:
+            yield self.create_text_message(f"Conversion Failed: {msg}")
+
+    def _convert_file(self, file):
+        """转换单个文件，返回 (safe_name, pdf_content, msg)；可在线程池中执行"""
+        safe_name = file.filename
+        try:
+            # --- 1. 文件名处理 ---
+            original_name = file.filename
+            safe_name = _UNSAFE_NAME_RE.sub("", original_name)
+            if not safe_name or len(safe_name) < 2: 
+                safe_name = "document.docx"
+            if not safe_name.lower().endswith('.docx'): 
+                safe_name += '.docx'
+            
+            # 转换结果只在本次调用中返回，不落盘缓存，不保留用户文件副本
+            docx_bytes = file.blob
+            pdf_content = None
+            msg = "Success"
+            if _SOFFICE_PATH:
+                pdf_content = self._convert_with_soffice(docx_bytes, safe_name)
+            if pdf_content is None:
+                # 执行转换（python-docx 直接从内存读取，无需落盘）
+                pdf_content, msg = self._convert_to_pdf(docx_bytes)
+
+            return safe_name, pdf_content, msg
+
+        except Exception as e:
+            import traceback
+            return safe_name, None, f"Error: {str(e)}\n{traceback.format_exc()}"
+
+    def _convert_with_soffice(self, docx_bytes, safe_name):
+        """调用 soffice --headless 转换，返回 PDF 字节；任何失败返回 None 以便回退"""
+        profile_dir = None
+        try:
+            profile_dir = _acquire_soffice_profile()
+            with tempfile.TemporaryDirectory() as temp_dir:
                 input_path = os.path.join(temp_dir, safe_name)
                 with open(input_path, 'wb') as f:
-                    f.write(file.blob)
-
-                # 执行转换
-                pdf_content, msg = self._convert_to_pdf(input_path, temp_dir)
-
-                if pdf_content:
-                    output_filename = os.path.splitext(safe_name)[0] + ".pdf"
-                    yield self.create_json_message({
-                        "status": "success",
-                        "source_file": safe_name,
-                        "output_file": output_filename
-                    })
-                    yield self.create_blob_message(
-                        blob=pdf_content,
-                        meta={
-                            "filename": output_filename, 
-                            "mime_type": "application/pdf"
-                        }
-                    )
-                else:
-                    yield self.create_text_message(f"Conversion Failed: {msg}")
-
-            except Exception as e:
-                import traceback
-                yield self.create_text_message(f"Error: {str(e)}\n{traceback.format_exc()}")
+                    f.write(docx_bytes)
+                cmd = [
+                    _SOFFICE_PATH, f"-env:UserInstallation={Path(profile_dir).as_uri()}",
+                    "--headless", "--nologo", "--nofirststartwizard",
+                    "--convert-to", "pdf", "--outdir", temp_dir, input_path
+                ]
+                proc = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=_SOFFICE_TIMEOUT)
+                output_path = os.path.splitext(input_path)[0] + ".pdf"
+                if proc.returncode != 0: return None
+                # 一次性整读；输出缺失时 open 抛出 OSError，无需额外的 exists 检查
+                with open(output_path, 'rb') as f:
+                    return f.read() or None
+        except (OSError, subprocess.SubprocessError):
+            return None
+        finally:
+            if profile_dir is not None: _release_soffice_profile(profile_dir)
 
     def _register_fonts(self):
+        """注册字体（每个进程只执行一次，后续转换直接复用结果）"""
+        global _FONT_MAP_CACHE
+        if _FONT_MAP_CACHE is not None:
+            return _FONT_MAP_CACHE
+        with _FONT_LOCK:
+            if _FONT_MAP_CACHE is None:
+                _FONT_MAP_CACHE = self._scan_and_register_fonts()
+        return _FONT_MAP_CACHE
+
+    def _scan_and_register_fonts(self):
         """注册字体，优先查找本地中文字体"""
         font_name = "STSong-Light"
         fonts = {"normal": "STSong-Light", "bold": "STSong-Light"}
         
-        candidates = [
-            ("msyh.ttf", "MicrosoftYaHei"),
-            ("simsun.ttc", "SimSun"),     
-            ("simhei.ttf", "SimHei"),     
-        ]
-        
-        search_dirs = [
-            os.path.join(os.path.dirname(__file__), "fonts"), 
-            "/usr/share/fonts/truetype", 
-            "C:\\Windows\\Fonts"
-        ]
+        # 同一进程内其他转换工具可能已注册过同名字体，直接复用，不再解析 TTF 文件
+        registered = set(pdfmetrics.getRegisteredFontNames())
 
-        for filename, alias in candidates:
-            for d in search_dirs:
-                path = os.path.join(d, filename)
-                if os.path.exists(path):
+        for filename, alias in _FONT_CANDIDATES:
+            if alias not in registered:
+                # 文件不存在时 TTFont 直接抛错，无需再单独 stat 一次
+                for d in _FONT_SEARCH_DIRS:
                     try:
-                        pdfmetrics.registerFont(TTFont(alias, path))
-                        if alias == "SimSun": fonts["normal"] = alias
-                        if alias == "SimHei": fonts["bold"] = alias
-                        if alias == "MicrosoftYaHei": fonts["normal"] = alias
+                        pdfmetrics.registerFont(TTFont(alias, os.path.join(d, filename)))
+                        registered.add(alias)
                         break
                     except Exception: 
                         continue
+            if alias in registered:
+                if alias == "SimSun": fonts["normal"] = alias
+                if alias == "SimHei": fonts["bold"] = alias
+                if alias == "MicrosoftYaHei": fonts["normal"] = alias
         try:
             pdfmetrics.registerFont(UnicodeCIDFont('STSong-Light'))
         except Exception: 
             pass
         return fonts
 
-    def _get_col_widths(self, docx_table, total_width_cm=17):
+    def _get_col_widths(self, grid_cols, total_width_cm=17):
+        # 缓存中的宽度元组直接交给 Table：reportlab 调整列宽前会先复制，不会修改传入的序列
         try:
-            tblGrid = docx_table._tbl.tblGrid
-            gridCols = tblGrid.gridCol_lst
-            if gridCols:
-                widths = [int(col.w) for col in gridCols]
-                total = sum(widths)
-                if total > 0: 
-                    return [(w/total)*total_width_cm*cm for w in widths]
+            if grid_cols:
+                return _scale_col_widths(tuple(int(col.w) for col in grid_cols), total_width_cm)
         except Exception: 
             pass
         return None 
 
-    def _convert_to_pdf(self, input_path, temp_dir):
-        doc = Document(input_path)
-        out_path = os.path.join(temp_dir, "temp_out.pdf")
+    def _convert_to_pdf(self, docx_bytes):
+        doc = Document(io.BytesIO(docx_bytes))
+        # 直接输出到内存，避免写盘后再读回
+        pdf_buffer = io.BytesIO()
         
         numbering_engine = DocxNumberingEngine(doc)
         
         doc_layout = SimpleDocTemplate(
-            out_path, pagesize=A4,
+            pdf_buffer, pagesize=A4,
             leftMargin=2*cm, rightMargin=2*cm, topMargin=2.54*cm, bottomMargin=2.54*cm
         )
         
@@ -249,82 +628,81 @@ class WordToPdfTool(Tool):
         base_font = font_map["normal"]
         bold_font = font_map["bold"] if font_map["bold"] != base_font else base_font
         
-        styles = getSampleStyleSheet()
-        
-        # --- 样式 ---
-        style_norm = ParagraphStyle(
-            'MyNormal', parent=styles['Normal'],
-            fontName=base_font, fontSize=10.5, leading=16,
-            wordWrap='CJK', spaceAfter=6, alignment=TA_JUSTIFY
-        )
-        style_h1 = ParagraphStyle(
-            'MyH1', parent=style_norm,
-            fontName=bold_font, fontSize=16, leading=22,
-            spaceBefore=18, spaceAfter=12, keepWithNext=True
-        )
-        style_h2 = ParagraphStyle(
-            'MyH2', parent=style_norm,
-            fontName=bold_font, fontSize=14, leading=20,
-            spaceBefore=12, spaceAfter=6, keepWithNext=True
-        )
-        style_h3 = ParagraphStyle(
-            'MyH3', parent=style_norm,
-            fontName=bold_font, fontSize=12, leading=18,
-            spaceBefore=6, spaceAfter=6, keepWithNext=True
-        )
+        styles = _get_paragraph_styles(base_font, bold_font)
+        style_cell = styles["table_cell"]
+        table_style = _get_table_style(base_font)
+        style_norm = styles["normal"]
 
         story = []
-        img_map = {}
+        # 只记录图片关系，blob 在确认被正文引用后才读取
+        image_rels = {}
         try:
-            for rel in doc.part.rels.values():
-                if "image" in rel.target_ref: img_map[rel.rId] = rel.target_part.blob
+            image_rels = {
+                rid: rel
+                for rid, rel in doc.part.rels.items()
+                if rel.reltype == RT.IMAGE and not rel.is_external
+            }
         except Exception: pass
 
+        # 样式 ID -> (段落样式, 书签层级)，每个文档只构建一次；未列出的样式按正文处理
+        style_dispatch = {}
+        for style in doc.styles:
+            heading = _classify_heading((style.name or "").lower())
+            if heading is not None:
+                style_key, level = heading
+                style_dispatch[style.style_id] = (styles[style_key], level)
+        default_dispatch = (style_norm, None)
+        # w:jc 取值 -> 段落样式；其余取值沿用样式本身的对齐方式
+        align_styles = {"center": styles["center"], "right": styles["right"]}
+
         # 【修正】书签层级追踪器，初始为-1（空）
         last_outline_level = -1
 
         body = doc.element.body
-        for child in body.iterchildren():
+
+        # 同一图片只构建一次 flowable；像素留到 build 绘制时解码，同一时刻只有正在绘制的图片占用位图内存
+        loaded_images = {}
+
+        get_numbering_text = numbering_engine.get_numbering_text
+        # 单元格文本 -> Paragraph：空单元格和重复取值只解析一次。
+        # Table 绘制每个单元格前都会按该列宽重新 wrap，同一 Paragraph 可安全地放入多个单元格
+        cell_paragraphs = {}
+
+        for child in body.iterchildren(_QN_P, _QN_TBL):
             
-            if isinstance(child, CT_P):
-                para = DocxParagraph(child, doc)
-                text = para.text.strip()
+            if child.tag == _QN_P:
+                text, images = _scan_paragraph(child)
+                text = text.strip()
                 
                 has_img = False
-                for blip in child.findall('.//{http://schemas.openxmlformats.org/drawingml/2006/main}blip'):
-                    rid = blip.get('{http://schemas.openxmlformats.org/officeDocument/2006/relationships}embed')
-                    if rid in img_map:
+                for rid, size in images:
+                    if rid in image_rels:
                         try:
-                            img_stm = io.BytesIO(img_map[rid])
-                            img = ImageReader(img_stm)
-                            w, h = img.getSize()
-                            if w > 16 * cm: 
-                                h = h * (16 * cm / w); w = 16 * cm
-                            story.append(RLImage(img_stm, width=w, height=h))
+                            base_img = loaded_images.get(rid)
+                            if base_img is None:
+                                base_img = loaded_images[rid] = _load_image(image_rels[rid].target_part.blob)
+                            # 每次放置浅拷贝同一 flowable，共享同一个 ImageReader；
+                            # 有 wp:extent 时按 Word 中的显示尺寸绘制，否则沿用图片本身尺寸
+                            img = copy.copy(base_img)
+                            if size is not None: img.drawWidth, img.drawHeight = size
+                            story.append(img)
                             has_img = True
                         except Exception: pass
                 
                 if not text and not has_img: continue
 
-                prefix = numbering_engine.get_numbering_text(para)
-                full_text = prefix + text
+                # w:pPr 只查找一次，序号、样式和对齐共用
+                pPr = child.find(_QN_P_PR)
+                full_text = get_numbering_text(pPr, text) + text
                 if not full_text: continue
 
-                style_name = para.style.name.lower() if para.style else ""
-                
-                use_style = style_norm
-                outline_level = None 
-                
-                if 'heading 1' in style_name:
-                    use_style = style_h1; outline_level = 0
-                elif 'heading 2' in style_name:
-                    use_style = style_h2; outline_level = 1
-                elif 'heading 3' in style_name:
-                    use_style = style_h3; outline_level = 2
-                elif 'title' in style_name:
-                    use_style = style_h1; outline_level = 0
+                style_node = pPr.find(_QN_P_STYLE) if pPr is not None else None
+                if style_node is not None:
+                    use_style, outline_level = style_dispatch.get(style_node.get(_QN_VAL), default_dispatch)
+                else:
+                    use_style, outline_level = default_dispatch
                 
-                safe_text = full_text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+                safe_text = full_text.translate(_XML_ESCAPE)
                 
                 if outline_level is not None:
                     # 【逻辑修正】防止跳级 (例如从 -1 跳到 1, 或从 0 跳到 2)
@@ -335,53 +713,58 @@ class WordToPdfTool(Tool):
                     # 更新追踪器
                     last_outline_level = outline_level
                     
-                    p = BookmarkParagraph(safe_text, use_style, level=outline_level)
+                    p = BookmarkParagraph(safe_text, _wrap_style(use_style, full_text), level=outline_level)
                 else:
-                    align = para.alignment
-                    if align == 1: p = Paragraph(safe_text, ParagraphStyle('C', parent=use_style, alignment=TA_CENTER))
-                    elif align == 2: p = Paragraph(safe_text, ParagraphStyle('R', parent=use_style, alignment=TA_RIGHT))
-                    else: p = Paragraph(safe_text, use_style)
+                    jc_node = pPr.find(_QN_JC) if pPr is not None else None
+                    align = jc_node.get(_QN_VAL) if jc_node is not None else None
+                    p = Paragraph(safe_text, _wrap_style(align_styles.get(align, use_style), full_text))
                         
                 story.append(p)
 
-            elif isinstance(child, CT_Tbl):
-                table = DocxTable(child, doc)
-                col_widths = self._get_col_widths(table)
+            else:
+                grid_cols = child.tblGrid.gridCol_lst
+                max_c = len(grid_cols)
+                if max_c == 0: continue
+                col_widths = self._get_col_widths(grid_cols)
                 
                 rows_data = []
-                max_c = len(table.columns)
-                if max_c == 0: continue
 
-                for row in table.rows:
+                # 直接遍历 w:tr/w:tc，横向合并的单元格按 gridSpan 重复，与 row.cells 一致
+                for tr in child.tr_lst:
                     r_data = []
-                    for cell in row.cells:
-                        ctext = cell.text.strip().replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
-                        p = Paragraph(ctext, ParagraphStyle('TC', parent=style_norm, fontSize=9, leading=12))
-                        r_data.append(p)
-                    while len(r_data) < max_c: r_data.append("")
-                    rows_data.append(r_data)
+                    for tc in tr.tc_lst:
+                        cell_text = _cell_text(tc).strip()
+                        cell_p = cell_paragraphs.get(cell_text)
+                        if cell_p is None:
+                            cell_p = cell_paragraphs[cell_text] = Paragraph(cell_text.translate(_XML_ESCAPE), _wrap_style(style_cell, cell_text))
+                        span = tc.grid_span
+                        if span == 1: r_data.append(cell_p)
+                        else: r_data.extend([cell_p] * span)
+                    if len(r_data) < max_c: r_data += [""] * (max_c - len(r_data))
+                    rows_data.append(r_data[:max_c])
 
                 if not rows_data: continue
                 
-                t = Table(rows_data, colWidths=col_widths)
-                t.setStyle(TableStyle([
-                    ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
-                    ('FONTNAME', (0, 0), (-1, -1), base_font),
-                    ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-                    ('LEFTPADDING', (0, 0), (-1, -1), 4),
-                    ('RIGHTPADDING', (0, 0), (-1, -1), 4),
-                    ('BACKGROUND', (0, 0), (-1, 0), colors.whitesmoke),
-                ]))
+                # 表格后的间距用 spaceAfter 表达，不再额外插入 Spacer；
+                # 拆页时只保留在最后一段上，文末也不会多占空间
+                t = Table(rows_data, colWidths=col_widths, spaceAfter=12)
+                t.setStyle(table_style)
                 story.append(t)
-                story.append(Spacer(1, 12))
+
+        # 排版前释放解析阶段的对象（XML 树、图片原始数据、图片 flowable 的额外引用）。
+        # build 会从 story 头部逐个消费 flowable，已绘制的图片随之可被回收
+        doc = body = child = image_rels = loaded_images = numbering_engine = cell_paragraphs = None
 
         try:
             doc_layout.build(story)
-            if os.path.exists(out_path) and os.path.getsize(out_path) > 0:
-                with open(out_path, 'rb') as f:
-                    return f.read(), "Success"
+            pdf_bytes = pdf_buffer.getvalue()
+            if pdf_bytes:
+                return pdf_bytes, "Success"
             else:
                 return None, "PDF generated but empty."
         except Exception as e:
             import traceback
-            return None, f"Build Error: {str(e)}"
\ No newline at end of file
+            return None, f"Build Error: {str(e)}"
+        finally:
+            # getvalue() 与缓冲区共享同一 bytes 对象，关闭后不再额外占用内存
+            pdf_buffer.close()
\ No newline at end of file
@@ -1,6 +1,7 @@
+import io
 import os
-import tempfile
-import time
+import zipfile
+import xml.etree.ElementTree as ET
 from collections.abc import Generator
 from typing import Any, Dict, Optional
 import json
@@ -9,12 +10,70 @@ from dify_plugin import Tool
 from dify_plugin.entities.tool import ToolInvokeMessage
 from dify_plugin.file.file import File
 
-# Try to import python-docx for Word processing
-try:
-    from docx import Document
-    DOCX_AVAILABLE = True
-except ImportError:
-    DOCX_AVAILABLE = False
+# WordprocessingML tags, used to read word/document.xml directly
+_W_NS = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+_W_P = _W_NS + 'p'
+_W_TBL = _W_NS + 'tbl'
+_W_TR = _W_NS + 'tr'
+_W_TC = _W_NS + 'tc'
+_W_R = _W_NS + 'r'
+_W_T = _W_NS + 't'
+_W_BR = _W_NS + 'br'
+_W_HYPERLINK = _W_NS + 'hyperlink'
+_W_VMERGE = _W_NS + 'tcPr/' + _W_NS + 'vMerge'
+_W_TYPE = _W_NS + 'type'
+_W_VAL = _W_NS + 'val'
+# Run children that stand for a fixed character, as python-docx maps them
+_RUN_CHARS = {
+    _W_NS + 'tab': '\t',
+    _W_NS + 'ptab': '\t',
+    _W_NS + 'cr': '\n',
+    _W_NS + 'noBreakHyphen': '-',
+}
+
+
+def _paragraph_text(p) -> str:
+    """Text of a w:p element: its runs and hyperlink runs, with tabs and line breaks mapped."""
+    parts = []
+    for child in p:
+        if child.tag == _W_R:
+            runs = (child,)
+        elif child.tag == _W_HYPERLINK:
+            runs = child.iterfind(_W_R)
+        else:
+            continue
+        for run in runs:
+            for item in run:
+                tag = item.tag
+                if tag == _W_T:
+                    parts.append(item.text or '')
+                elif tag == _W_BR:
+                    # Page and column breaks carry no text
+                    if item.get(_W_TYPE, 'textWrapping') == 'textWrapping':
+                        parts.append('\n')
+                else:
+                    char = _RUN_CHARS.get(tag)
+                    if char:
+                        parts.append(char)
+    return ''.join(parts)
+
+
+def _table_lines(tbl) -> list:
+    """One ' | '-joined line per table row, skipping empty cells and vertically merged continuations."""
+    lines = []
+    for tr in tbl.iterfind(_W_TR):
+        row_text = []
+        for tc in tr.iterfind(_W_TC):
+            # A vMerge without val="restart" continues the cell above, which has been read already
+            v_merge = tc.find(_W_VMERGE)
+            if v_merge is not None and v_merge.get(_W_VAL, 'continue') != 'restart':
+                continue
+            cell_text = '\n'.join(_paragraph_text(p) for p in tc.iterfind(_W_P)).strip()
+            if cell_text:
+                row_text.append(cell_text)
+        if row_text:
+            lines.append(" | ".join(row_text))
+    return lines
 
 class WordToTextTool(Tool):
     """Tool for converting Word documents to text format."""
@@ -35,10 +94,6 @@ class WordToTextTool(Tool):
             "url": file.url
         }
         
-        # Add path attribute if it exists (for MockFile in testing)
-        if hasattr(file, 'path'):
-            file_info["path"] = file.path
-            
         return file_info
     
     def _invoke(self, tool_parameters: dict[str, Any]) -> Generator[ToolInvokeMessage]:
@@ -54,186 +109,132 @@ class WordToTextTool(Tool):
             file_info = self.get_file_info(file)
                 
             # Validate input file format
-            if not self._validate_input_file(file_info):
+            if not self._validate_input_file(file_info, file.blob):
                 yield self.create_text_message("Error: Invalid file format. Only .docx files are supported (not .doc)")
                 return
                 
-            # Create temporary directory for input file
-            with tempfile.TemporaryDirectory() as temp_dir:
-                # Use the test directory as output directory
-                import os
-                output_dir = r"D:\Work\Cursor\file_converter\test"
-                os.makedirs(output_dir, exist_ok=True)
+            # Process conversion straight from the uploaded bytes
+            base_name = os.path.splitext(file_info["filename"])[0]
+            result = self._process_conversion(file.blob, base_name)
+            
+            if result["success"]:
+                # Create output file info
+                output_files = []
+                for output_file_info in result["output_files"]:
+                    output_files.append({
+                        "filename": output_file_info["filename"],
+                        "size": len(output_file_info["content"])
+                    })
                 
-                # Save uploaded file to temp directory
-                input_path = os.path.join(temp_dir, file_info["filename"])
-                with open(input_path, 'wb') as f:
-                    f.write(file.blob)
+                # Create JSON response
+                json_response = {
+                    "success": True,
+                    "conversion_type": "word_2_text",
+                    "input_file": file_info,
+                    "output_files": output_files,
+                    "message": result["message"]
+                }
                 
-                # Update file info with the actual path
-                file_info["path"] = input_path
+                # Send text message
+                yield self.create_text_message(f"Word document converted to text successfully: {result['message']}")
                 
-                # Process conversion
-                result = self._process_conversion(input_path, temp_dir)
+                # Send JSON message
+                yield self.create_json_message(json_response)
                 
-                if result["success"]:
-                    # Create output file info
-                    output_files = []
-                    for output_file_info in result["output_files"]:
-                        output_files.append({
-                            "filename": output_file_info["filename"],
-                            "size": len(output_file_info["content"]),
-                            "path": output_file_info["path"]
-                        })
-                    
-                    # Create JSON response
-                    json_response = {
-                        "success": True,
-                        "conversion_type": "word_2_text",
-                        "input_file": file_info,
-                        "output_files": output_files,
-                        "message": result["message"]
-                    }
-                    
-                    # Send text message
-                    yield self.create_text_message(f"Word document converted to text successfully: {result['message']}")
-                    
-                    # Send JSON message
-                    yield self.create_json_message(json_response)
-                    
-                    # Send output files
-                    for file_info in result["output_files"]:
-                        try:
-                            # Use the pre-read content
-                            if "content" in file_info:
-                                yield self.create_blob_message(
-                                    blob=file_info["content"], 
-                                    meta={
-                                        "filename": file_info["filename"],
-                                        "mime_type": "text/plain"
-                                    }
-                                )
-                            else:
-                                yield self.create_text_message(f"Error: No content available for file {file_info.get('filename', 'unknown')}")
-                        except Exception as e:
-                            yield self.create_text_message(f"Error sending file: {str(e)}")
-                    
-                    # Clean up only the temporary directory, not the output directory
+                # Send output files
+                for file_info in result["output_files"]:
                     try:
-                        import shutil
-                        # Only clean up the temp directory, not the output directory
-                        # The temp directory will be automatically cleaned up by the context manager
-                        pass
+                        # Use the pre-read content
+                        if "content" in file_info:
+                            yield self.create_blob_message(
+                                blob=file_info["content"], 
+                                meta={
+                                    "filename": file_info["filename"],
+                                    "mime_type": "text/plain"
+                                }
+                            )
+                        else:
+                            yield self.create_text_message(f"Error: No content available for file {file_info.get('filename', 'unknown')}")
                     except Exception as e:
-                        # Ignore cleanup errors
-                        pass
-                else:
-                    # Send error message
-                    yield self.create_text_message(f"Conversion failed: {result['message']}")
-                    
+                        yield self.create_text_message(f"Error sending file: {str(e)}")
+            else:
+                # Send error message
+                yield self.create_text_message(f"Conversion failed: {result['message']}")
+                
         except Exception as e:
             yield self.create_text_message(f"Error during conversion: {str(e)}")
     
-    def _validate_input_file(self, file_info: dict) -> bool:
+    def _validate_input_file(self, file_info: dict, content: Optional[bytes] = None) -> bool:
         """Validate if the input file is a valid Word document."""
         # Check file extension
         if not file_info["extension"].lower().endswith('.docx'):
             return False
             
-        # Check if file is readable by python-docx
-        if DOCX_AVAILABLE and "path" in file_info:
+        # Check the package structure from the zip central directory, without parsing any XML;
+        # the document itself is parsed only once, in _process_conversion
+        if content is not None:
             try:
-                doc = Document(file_info["path"])
-                # Try to access the document to ensure it's valid
-                _ = doc.paragraphs[0].text if doc.paragraphs else ""
-                return True
-            except Exception:
+                with zipfile.ZipFile(io.BytesIO(content)) as package:
+                    return 'word/document.xml' in package.namelist()
+            except zipfile.BadZipFile:
                 return False
         
-        # If python-docx is not available or path not available, just check file extension
+        # Without content, just check file extension; a corrupt document is reported by
+        # _process_conversion, which parses it anyway
         return True
     
-    def _process_conversion(self, input_path: str, temp_dir: str) -> Dict[str, Any]:
-        """Process the Word to text conversion using python-docx."""
+    def _process_conversion(self, docx_bytes: bytes, base_name: str) -> Dict[str, Any]:
+        """Process the Word to text conversion by reading the document XML directly."""
         output_files = []
         
-        # Generate output file path
-        base_name = os.path.splitext(os.path.basename(input_path))[0]
-        output_path = os.path.join(temp_dir, f"{base_name}.txt")
-        
-        # Check if required libraries are available
-        if not DOCX_AVAILABLE:
-            return {"success": False, "message": "Required library (python-docx) is not available. Please install it using: pip install python-docx"}
-        
         try:
-            # Load the Word document
-            doc = Document(input_path)
-            
-            # Extract text from paragraphs
-            text_content = []
-            
-            # Process paragraphs
-            for para in doc.paragraphs:
-                text = para.text.strip()
-                if text:
-                    text_content.append(text)
-            
-            # Process tables
-            for table in doc.tables:
-                text_content.append("\n--- Table ---")
-                for row in table.rows:
-                    row_text = []
-                    for cell in row.cells:
-                        cell_text = cell.text.strip()
-                        if cell_text:
-                            row_text.append(cell_text)
-                    if row_text:
-                        text_content.append(" | ".join(row_text))
-                text_content.append("--- End of Table ---\n")
-            
-            # Join all text content
-            full_text = "\n\n".join(text_content)
-            
-            # Write text to file
-            with open(output_path, 'w', encoding='utf-8') as f:
-                f.write(full_text)
-            
-            # Wait for file to be fully written
-            time.sleep(1)
-            
-            # Check if file exists and has content
-            if not os.path.exists(output_path):
-                return {"success": False, "message": "Output text file was not created"}
-                
-            if os.path.getsize(output_path) == 0:
+            # Read word/document.xml straight from the package instead of building the
+            # python-docx object model; body-level elements are handled as they finish
+            # parsing and then dropped, so only the extracted text stays in memory.
+            # Paragraphs and tables are written in document order, each block followed
+            # by the blank-line separator
+            text_buf = io.StringIO()
+            with zipfile.ZipFile(io.BytesIO(docx_bytes)) as package, package.open('word/document.xml') as xml_file:
+                depth = 0
+                body = None
+                for event, el in ET.iterparse(xml_file, events=('start', 'end')):
+                    if event == 'start':
+                        depth += 1
+                        if depth == 2:
+                            body = el
+                        continue
+                    if depth == 3:
+                        # Process paragraphs
+                        if el.tag == _W_P:
+                            # Blank padding paragraphs are common; skip them without making a stripped copy
+                            text = _paragraph_text(el)
+                            if text and not text.isspace():
+                                text_buf.write(text.strip())
+                                text_buf.write("\n\n")
+                        # Process tables
+                        elif el.tag == _W_TBL:
+                            text_buf.write("\n--- Table ---\n\n")
+                            for line in _table_lines(el):
+                                text_buf.write(line)
+                                text_buf.write("\n\n")
+                            text_buf.write("--- End of Table ---\n\n\n")
+                        body.remove(el)
+                    depth -= 1
+            # Drop the separator after the last block
+            full_text = text_buf.getvalue()[:-2]
+            if not full_text:
                 return {"success": False, "message": "Output text file is empty"}
             
-            # Try multiple times to read the file
-            file_content = None
-            for attempt in range(3):
-                try:
-                    with open(output_path, 'r', encoding='utf-8') as f:
-                        file_content = f.read()
-                    break
-                except Exception as e:
-                    if attempt < 2:
-                        time.sleep(1)
-                    else:
-                        return {"success": False, "message": f"Error reading converted file: {str(e)}"}
-            
-            if file_content:
-                output_files.append({
-                    "path": output_path,
-                    "content": file_content.encode('utf-8'),
-                    "filename": f"{base_name}.txt"
-                })
-                return {
-                    "success": True, 
-                    "message": "Word document converted to text successfully",
-                    "output_files": output_files
-                }
-            else:
-                return {"success": False, "message": "Failed to read converted file after multiple attempts"}
+            # Keep the result in memory; it is returned as a blob, never read back from disk
+            output_files.append({
+                "content": full_text.encode('utf-8'),
+                "filename": f"{base_name}.txt"
+            })
+            return {
+                "success": True, 
+                "message": "Word document converted to text successfully",
+                "output_files": output_files
+            }
                     
         except Exception as e:
             return {"success": False, "message": f"Error converting Word to text: {str(e)}"}
\ No newline at end of file